@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+"""Time `AsyncSession.gets` on large batches against a local stub server.
+
+Run from the root directory:
+    python -m benchmarks.bench_gets 10000 100000 --distinct 10
+
+With 10 distinct urls almost every request is a cache hit, so the batch
+bookkeeping dominates; the figures in the history were taken this way.
+More distinct urls, e.g. `--distinct 1000`, time the stub server as well.
+"""
+
+import argparse
+import asyncio
+from aiohttp import web
+from brawlpython.sessions import AsyncSession
+import time
+
+
+async def handler(request):
+    return web.json_response({"tag": request.match_info["tag"]})
+
+
+async def start_server(port: int) -> web.AppRunner:
+    app = web.Application()
+    app.router.add_get("/players/{tag}", handler)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+
+    return runner
+
+
+async def bench(port: int, total: int, distinct: int,
+                max_concurrency: int) -> float:
+    urls = [f"http://127.0.0.1:{port}/players/{i % distinct}"
+            for i in range(total)]
+
+    session = await AsyncSession(
+        cache_limit=distinct, max_concurrency=max_concurrency)
+    async with session:
+        start = time.perf_counter()
+        results = await session.gets(urls)
+        elapsed = time.perf_counter() - start
+
+    assert len(results) == total
+    return elapsed
+
+
+async def main(args: argparse.Namespace) -> None:
+    runner = await start_server(args.port)
+    try:
+        for total in args.totals:
+            elapsed = await bench(
+                args.port, total, args.distinct, args.max_concurrency)
+            print(f"{total:>7} urls, {args.distinct} distinct: "
+                  f"{elapsed:8.3f}s, {elapsed / total * 1e6:7.1f}us/url")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("totals", type=int, nargs="*",
+                        default=[10_000, 100_000])
+    parser.add_argument("--distinct", type=int, default=10)
+    parser.add_argument("--max-concurrency", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8766)
+
+    asyncio.run(main(parser.parse_args()))
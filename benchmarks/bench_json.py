@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+"""Compare json, ujson and orjson on response bodies,
+parsed from bytes and from str decoded first, as `response.text()` did,
+and eager parsing with `LazyJSON` when one field of every item is read.
+
+Run from the root directory with recorded bodies, e.g. saved rankings:
+    python -m benchmarks.bench_json rankings.json members.json
+Without files, rankings and members pages of the api's shape are generated.
+"""
+
+import argparse
+import importlib
+import json
+import random
+import string
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+from brawlpython.lazy_json import LazyJSON
+
+
+def _tag() -> str:
+    return "#" + "".join(random.choices("0289PYLQGRJCUV", k=9))
+
+
+def _name() -> str:
+    return "".join(random.choices(string.ascii_letters, k=12))
+
+
+def rankings_page(count: int) -> bytes:
+    items = [{
+        "tag": _tag(), "name": _name(), "nameColor": "0xffffffff",
+        "icon": {"id": 28000000}, "trophies": 50000 - i, "rank": i + 1,
+        "club": {"name": _name()}} for i in range(count)]
+
+    return json.dumps({"items": items, "paging": {"cursors": {}}}).encode()
+
+
+def members_page(count: int) -> bytes:
+    items = [{
+        "tag": _tag(), "name": _name(), "nameColor": "0xffffffff",
+        "role": "member", "trophies": 30000 - i,
+        "icon": {"id": 28000000}} for i in range(count)]
+
+    return json.dumps({"items": items, "paging": {"cursors": {}}}).encode()
+
+
+def available_loads() -> Dict[str, Callable]:
+    loads = {}
+    for name in "json", "ujson", "orjson":
+        try:
+            loads[name] = importlib.import_module(name).loads
+        except ImportError:
+            print(f"{name} is not installed, skipped")
+    return loads
+
+
+def timeit(func: Callable, body: bytes, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(body)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(func: Callable, body: bytes) -> int:
+    tracemalloc.start()
+    try:
+        func(body)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def read_fields(loads: Callable) -> Callable:
+    def read(body: bytes) -> list:
+        items = loads(body)["items"]
+        return [item["tag"] for item in items]
+    return read
+
+
+def main(args: argparse.Namespace) -> None:
+    bodies = {}
+    for path in args.payloads:
+        with open(path, "rb") as file:
+            bodies[path] = file.read()
+
+    if not bodies:
+        bodies["rankings x200"] = rankings_page(200)
+        bodies["members x100"] = members_page(100)
+        bodies["rankings x20000"] = rankings_page(20_000)
+
+    libraries = available_loads()
+    for title, body in bodies.items():
+        print(f"{title}: {len(body) / 1024:.1f} KiB")
+
+        for name, loads in libraries.items():
+            from_bytes = timeit(loads, body, args.repeat)
+            from_str = timeit(
+                lambda b: loads(b.decode("utf-8")), body, args.repeat)
+            print(f"  {name:>6}: bytes {from_bytes * 1e3:8.3f}ms, "
+                  f"str {from_str * 1e3:8.3f}ms")
+
+        print("  one field of every item:")
+        readers = {name: read_fields(loads)
+                   for name, loads in libraries.items()}
+        readers["lazy"] = read_fields(LazyJSON)
+        for name, read in readers.items():
+            elapsed = timeit(read, body, args.repeat)
+            peak = peak_memory(read, body)
+            print(f"  {name:>6}: {elapsed * 1e3:8.3f}ms, "
+                  f"peak {peak / 2 ** 20:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("payloads", nargs="*")
+    parser.add_argument("--repeat", type=int, default=20)
+
+    main(parser.parse_args())
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+"""Time the broadcasting of batch parameters in `api_toolkit`,
+as in `players([...tags])`, before any request is sent.
+
+Run from the root directory:
+    python -m benchmarks.bench_rearrange 10000 50000
+"""
+
+import argparse
+from brawlpython.api_toolkit import (
+    rearrange_args, rearrange_columns, rearrange_params)
+import time
+from typing import Callable
+
+
+def timeit(func: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(args: argparse.Namespace) -> None:
+    for total in args.totals:
+        tags = [f"#{i}" for i in range(total)]
+        urls = [f"https://api.test/players/{tag}" for tag in tags]
+
+        cases = {
+            "rearrange_params": lambda: list(rearrange_params(
+                "official", "players", tag=tags, limit=None)),
+            "rearrange_columns": lambda: rearrange_columns(
+                "official", "players", tag=tags, limit=None),
+            "rearrange_args": lambda: list(rearrange_args(
+                urls, True, "{}", None)),
+        }
+
+        print(f"{total} rows:")
+        for name, func in cases.items():
+            elapsed = timeit(func, args.repeat)
+            print(f"  {name:>17}: {elapsed * 1e3:8.3f}ms, "
+                  f"{elapsed / total * 1e9:6.0f}ns/row")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("totals", type=int, nargs="*",
+                        default=[10_000, 50_000])
+    parser.add_argument("--repeat", type=int, default=5)
+
+    main(parser.parse_args())
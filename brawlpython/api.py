@@ -1,14 +1,21 @@
 # -*- coding: utf-8 -*-
 
 from .api_toolkit import make_headers
-from .typedefs import STRDICT
+from .exceptions import InvalidTag
+from .typedefs import STRDICT, NUMBER
 
+from functools import lru_cache
 from pyformatting import defaultformatter
-from typing import Any, Dict, Optional, Union
+from string import Formatter
+from typing import (
+    Any, Callable, Dict, Iterable, List, Optional, Tuple, Union)
 import urllib.parse as parse
 
 __all__ = (
     "API",
+    "compile_template",
+    "normalize_tag",
+    "TAG_CHARS",
     "default_api_dict",
     "KINDS",
     "KIND_VALS",
@@ -22,13 +29,74 @@ __all__ = (
 
 default_format = defaultformatter(str)
 
+LIMIT = "?limit={limit}"
+
+
+def _plain_field(field: Optional[str], spec: str,
+                 conversion: Optional[str]) -> bool:
+    return field is None or (field.isidentifier() and not spec
+                             and conversion is None)
+
+
+def compile_template(template: str) -> Callable[[Dict[str, Any]], str]:
+    """Parse `template` once into a function that formats a dict of params
+    like `default_format`: missing and None params become empty strings.
+    """
+    parsed = list(Formatter().parse(template))
+    if not all(_plain_field(*part[1:]) for part in parsed):
+        # specs, conversions and indexing are left to the formatter
+        return lambda params: default_format(template, **params)
+
+    parts = [(literal, field) for literal, field, _, _ in parsed]
+
+    def format_template(params: Dict[str, Any]) -> str:
+        result = []
+        for literal, field in parts:
+            result.append(literal)
+            if field is not None:
+                value = params.get(field)
+                if value is not None:
+                    result.append(str(value))
+        return "".join(result)
+
+    return format_template
+
+
+# tags of players and clubs consist only of these characters
+TAG_CHARS = frozenset("0289PYLQGRJCUV")
+
+
+@lru_cache(maxsize=4096)
+def normalize_tag(tag: str, hashtag: bool = True,
+                  validate: bool = True) -> str:
+    """Strip and percent-encode `tag`.
+    If `validate`, the tag is also upper-cased, its O's become zeros,
+    and `InvalidTag` is raised if it can't exist.
+    Crawls see the same tags many times, so the results are cached.
+    """
+    if validate:
+        clean = tag.strip().lstrip("#").upper().replace("O", "0")
+        if not clean or not TAG_CHARS.issuperset(clean):
+            raise InvalidTag(tag)
+    else:
+        # ids of other apis are sent as they are
+        clean = tag.strip("#")
+
+    if hashtag:
+        clean = "#" + clean
+
+    return parse.quote_plus(clean)
+
 
 class API:
 
-    __slots__ = "base", "endpoints", "hashtag", "headers"
+    __slots__ = "base", "endpoints", "hashtag", "headers", "ttls", \
+        "validate_tags", "_templates"
 
     def __init__(self, base: str, endpoints: STRDICT = {},
-                 hashtag: bool = True) -> None:
+                 hashtag: bool = True,
+                 ttls: Dict[str, NUMBER] = {},
+                 validate_tags: bool = True) -> None:
 
         http = base.startswith("http://")
         https = base.startswith("https://")
@@ -44,16 +112,28 @@ class API:
         self.base = base
         self.headers = {}
         self.endpoints = {}
+        self._templates = {}
         self.append(endpoints)
         self.hashtag = hashtag
+        self.ttls = dict(ttls)
+        self.validate_tags = validate_tags
 
     def append(self, endpoints: STRDICT) -> None:
+        """Add endpoints, their url templates are compiled here
+        with and without the limit.
+        """
+        urls = {}
+        templates = {}
         for name, path in endpoints.items():
             if name == "base":
                 raise ValueError("names must be not 'base'")
-            endpoints[name] = parse.urljoin(self.base, path)
+            url = urls[name] = parse.urljoin(self.base, path)
+            templates[name] = (compile_template(url),
+                               compile_template(url + LIMIT))
 
-        self.endpoints.update(endpoints)
+        # new dicts, so that copies of the api don't share the endpoints
+        self.endpoints = {**self.endpoints, **urls}
+        self._templates = {**self._templates, **templates}
 
     def set_api_key(self, api_key: str) -> None:
         if api_key is not None:
@@ -69,25 +149,46 @@ class API:
 
         return get
 
+    def get_ttl(self, name: str) -> Optional[NUMBER]:
+        """How long responses of the endpoint can be cached,
+        None if the session should decide.
+        """
+        return self.ttls.get(name)
+
+    def _get_templates(self, name: str) -> Tuple[Callable, Callable]:
+        templates = self._templates.get(name)
+        if templates is None:
+            url = self.get(name)  # the base or an error
+            templates = (compile_template(url),
+                         compile_template(url + LIMIT))
+        return templates
+
     def make_url(self, name: str, **params) -> str:
-        url = self.get(name)
+        plain, with_limit = self._get_templates(name)
 
         tag = params.get("tag")
         if tag is not None:
             params["tag"] = self.remake_tag(tag)
 
         if params.get("limit") is not None:
-            url += "?limit={limit}"
-
-        return default_format(url, **params)
+            return with_limit(params)
+        return plain(params)
+
+    def make_urls(self, name: str, tags: Iterable[str],
+                  **params) -> List[str]:
+        """`make_url` for many tags and the same other params."""
+        plain, with_limit = self._get_templates(name)
+        template = plain if params.get("limit") is None else with_limit
+
+        remake_tag = self.remake_tag
+        urls = []
+        for tag in tags:
+            params["tag"] = remake_tag(tag)
+            urls.append(template(params))
+        return urls
 
     def remake_tag(self, tag: str) -> str:
-        tag = tag.strip("#")
-
-        if self.hashtag:
-            tag = "#" + tag
-
-        return parse.quote_plus(tag)
+        return normalize_tag(tag, self.hashtag, self.validate_tags)
 
 
 # before and after - is so impractical that I suppose nobody will use this
@@ -109,6 +210,21 @@ starlist = {
     "clublog": "clublog/{tag}",
     "translations": "translations/{code}"}
 
+# how many seconds the responses can be cached,
+# endpoints that are not listed change too often to tell
+HOUR = 60 * 60
+
+official_ttls = {
+    "rankings": 5 * 60,
+    "brawlers": 6 * HOUR}
+
+starlist_ttls = {
+    "brawlers": 6 * HOUR,
+    "icons": 24 * HOUR,
+    "maps": 6 * HOUR,
+    "gamemodes": 24 * HOUR,
+    "translations": 24 * HOUR}
+
 KINDS = {
     "b": "brawlers",
     "c": "clubs",
@@ -125,7 +241,8 @@ OFFICS = (OFFIC, CHI)
 UNOFFICS = (STAR,)
 
 default_api_dict = {
-    OFFIC: API("api.brawlstars.com/v1", official),
-    CHI: API("api.brawlstars.cn/v1", official),
-    STAR: API("api.starlist.pro", starlist, hashtag=False),
+    OFFIC: API("api.brawlstars.com/v1", official, ttls=official_ttls),
+    CHI: API("api.brawlstars.cn/v1", official, ttls=official_ttls),
+    STAR: API("api.starlist.pro", starlist, hashtag=False,
+              ttls=starlist_ttls),
 }
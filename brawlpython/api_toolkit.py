@@ -5,9 +5,11 @@ from .typedefs import STRDICT
 from .cache_utils import somecachedmethod, iscorofunc
 from asyncio import ensure_future as ensure, gather
 from collections.abc import ByteString, Collection, Mapping, Sized
-from functools import update_wrapper
+from functools import partial, update_wrapper
+from itertools import islice, repeat
 import sys
-from typing import Dict, Union
+from typing import (
+    Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union)
 
 __all__ = (
     "default_headers",
@@ -23,6 +25,8 @@ __all__ = (
     "unique",
     "prepare_param",
     "check_params",
+    "broadcast",
+    "rearrange_columns",
     "_rearrange_params",
     "rearrange_params",
     "_rearrange_args",
@@ -118,44 +122,188 @@ def check_params(args, kwargs):
     return args, kwargs, total_length
 
 
-def _rearrange_params(args, kwargs):
-    new_args, new_kwargs, length = check_params(args[:], kwargs.copy())
+# type -> whether its instances are broadcast, the abc checks are slow,
+# so they run once per type and are reused by all later calls
+_BROADCAST_TYPES = {
+    kind: False
+    for kind in (str, bytes, bytearray, dict, int, float, bool, type(None))}
+_BROADCAST_TYPES.update({list: True, tuple: True})
 
-    for _ in range(length):
-        current_args = []
-        for (kind, val) in new_args:
-            if kind == "m":
-                val = next(val)
-            current_args.append(val)
 
-        current_kwargs = {}
-        for key, (kind, val) in new_kwargs.items():
-            if kind == "m":
-                val = next(val)
-            current_kwargs[key] = val
+def _broadcast_type(kind: type) -> bool:
+    get = _BROADCAST_TYPES.get(kind)
+    if get is None:
+        get = _BROADCAST_TYPES[kind] = (
+            issubclass(kind, Collection)
+            and not issubclass(kind, (str, ByteString, Mapping)))
+    return get
 
-        yield tuple(current_args), current_kwargs
+
+def _classify(param: Any) -> Tuple[bool, Any]:
+    """`(True, values)` if the parameter varies between the rows,
+    `(False, value)` if it is the same in all of them.
+    """
+    kind = type(param)
+    if not _broadcast_type(kind):
+        return False, param
+
+    count = len(param)
+    if count > 1:
+        if kind is not list and kind is not tuple:
+            param = list(param)
+        return True, param
+    if count == 1:
+        return False, next(iter(param))
+    return False, param
+
+
+def broadcast(params: Sequence[Any]) -> Tuple[int, List[Tuple[bool, Any]]]:
+    """Classify every parameter once and count the rows they make."""
+    classified = [_classify(param) for param in params]
+
+    length = None
+    for varies, values in classified:
+        if varies:
+            if length is None:
+                length = len(values)
+            elif length != len(values):
+                raise ValueError(
+                    "All allowed iterable parameters "
+                    "must be of the same length.")
+
+    return (1 if length is None else length), classified
+
+
+def _rows(classified: List[Tuple[bool, Any]],
+          length: int) -> Iterator[tuple]:
+    if not classified:
+        return repeat((), length)
+
+    return zip(*[values if varies else repeat(values, length)
+                 for varies, values in classified])
+
+
+def rearrange_columns(
+        *args: Any, **kwargs: Any
+) -> Tuple[int, List[Sequence[Any]], Dict[str, Sequence[Any]]]:
+    """Broadcast the parameters into parallel lists, one per parameter,
+    instead of a dict per row.
+    """
+    length, classified = broadcast((*args, *kwargs.values()))
+    columns = [values if varies else [values] * length
+               for varies, values in classified]
+
+    count = len(args)
+    return length, columns[:count], dict(zip(kwargs, columns[count:]))
+
+
+def _rearrange_params(args, kwargs) -> Iterator[Tuple[tuple, dict]]:
+    length, classified = broadcast((*args, *kwargs.values()))
+
+    count = len(args)
+    keys = tuple(kwargs)
+    # the rows are assembled by zip, map and dict, not in python loops
+    kwarg_rows = map(dict, map(zip, repeat(keys, length),
+                               _rows(classified[count:], length)))
+    return zip(_rows(classified[:count], length), kwarg_rows)
 
 
 def rearrange_params(*args, **kwargs):
     return _rearrange_params(args, kwargs)
 
 
-def _rearrange_args(args):
-    for a, kw in _rearrange_params(args, {}):
-        yield a
+def _rearrange_args(args) -> Iterator[tuple]:
+    # without keyword arguments the rows of zip are the results
+    length, classified = broadcast(args)
+    return _rows(classified, length)
 
 
 def rearrange_args(*args):
     return _rearrange_args(args)
 
 
-def multiparams(func):
-    if iscorofunc(func):
-        async def wrapper(*args, **kwargs):
+async def _run_chunk(func: Callable, chunk: List[Tuple[tuple, dict]],
+                     concurrency: Optional[int]) -> List[Any]:
+
+    if concurrency is None or concurrency >= len(chunk):
+        tasks = [ensure(func(*a, **kw)) for a, kw in chunk]
+        results = tasks
+    else:
+        # results are written by position, workers share the rows
+        results = [None] * len(chunk)
+        rows = enumerate(chunk)
+
+        async def worker():
+            for i, (a, kw) in rows:
+                results[i] = await func(*a, **kw)
+
+        tasks = [ensure(worker()) for _ in range(concurrency)]
+
+    try:
+        done = await gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    return done if results is tasks else results
+
+
+def multiparams(func: Optional[Callable] = None, *,
+                chunk_size: Optional[int] = None,
+                concurrency: Optional[int] = None,
+                stream: bool = False) -> Callable:
+    """Call `func` once for every row of the broadcast parameters.
+    For coroutine functions only `chunk_size` rows are scheduled
+    at a time and at most `concurrency` calls run at once,
+    so that large fan-outs don't create every task up front.
+    With `stream` the results are yielded in order instead of returned,
+    a chunk at a time, so coroutine functions need a `chunk_size`.
+    Functions are called one by one, the options of coroutine functions
+    raise `ValueError` for them.
+    Can be used as `@multiparams` or `@multiparams(chunk_size=...)`.
+    """
+    if func is None:
+        return partial(multiparams, chunk_size=chunk_size,
+                       concurrency=concurrency, stream=stream)
+
+    if chunk_size is not None and chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if concurrency is not None and concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    coro = iscorofunc(func)
+    if not coro and (chunk_size is not None or concurrency is not None):
+        raise ValueError(
+            "chunk_size and concurrency need a coroutine function")
+    if coro and stream and chunk_size is None:
+        # one chunk of everything would be awaited before the first yield
+        raise ValueError("stream needs a chunk_size")
+
+    if coro:
+        async def chunks(args, kwargs):
             params = _rearrange_params(args, kwargs)
-            tasks = [ensure(func(*a, **kw)) for a, kw in params]
-            return await gather(*tasks)
+            while True:
+                chunk = list(islice(params, chunk_size))
+                if not chunk:
+                    return
+                yield await _run_chunk(func, chunk, concurrency)
+
+        if stream:
+            async def wrapper(*args, **kwargs):
+                async for results in chunks(args, kwargs):
+                    for result in results:
+                        yield result
+        else:
+            async def wrapper(*args, **kwargs):
+                results = []
+                async for chunk_results in chunks(args, kwargs):
+                    results += chunk_results
+                return results
+    elif stream:
+        def wrapper(*args, **kwargs):
+            for a, kw in _rearrange_params(args, kwargs):
+                yield func(*a, **kw)
     else:
         def wrapper(*args, **kwargs):
             params = _rearrange_params(args, kwargs)
@@ -1,10 +1,29 @@
 # -*- coding: utf-8 -*-
 
+from abc import ABC, abstractmethod
 import asyncio
-from cachetools import keys, Cache
+from cachetools import keys, Cache, LRUCache
 from functools import wraps, partial, update_wrapper
+import hashlib
+import heapq
+from itertools import count
+import sqlite3
+import sys
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, Hashable, Mapping, Optional, Tuple
+
+from .typedefs import NUMBER
 
 __all__ = (
+    "max_age",
+    "CacheEntry",
+    "freeze_json",
+    "json_size",
+    "BaseCache",
+    "MemoryCache",
+    "SQLiteCache",
     "NaN",
     "async_cachedmethod",
     "cachedmethod",
@@ -18,6 +37,319 @@ class NaN:
     pass
 
 
+def max_age(cache_control: Optional[str]) -> Optional[int]:
+    """Seconds a response can be cached according to
+    its `Cache-Control` header, None if the header does not tell.
+    """
+    if not cache_control:
+        return None
+
+    for directive in cache_control.lower().split(","):
+        name, _, value = directive.strip().partition("=")
+        if name == "no-store":
+            return 0
+        if name == "max-age":
+            try:
+                return max(0, int(value.strip('" ')))
+            except ValueError:
+                return None
+
+    return None
+
+
+class CacheEntry(object):
+    """Body of a cached response, `size` is its length in bytes
+    plus the size of `decoded`, the parsed body, if the session caches it.
+    `etag` and `last_modified` are the validators of the response.
+    """
+
+    __slots__ = "data", "size", "decoded", "etag", "last_modified"
+
+    def __init__(self, data: bytes, etag: Optional[str] = None,
+                 last_modified: Optional[str] = None) -> None:
+        self.data = data
+        self.size = len(data)
+        self.decoded = NaN
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def __getstate__(self):
+        # the parsed body is cheaper to rebuild than to store twice
+        return self.data, self.etag, self.last_modified
+
+    def __setstate__(self, state) -> None:
+        self.__init__(*state)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers that ask the server to reply 304 if nothing changed."""
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def update_validators(self, headers: Mapping[str, str]) -> None:
+        self.etag = headers.get("ETag", self.etag)
+        self.last_modified = headers.get("Last-Modified", self.last_modified)
+
+
+def freeze_json(obj: Any) -> Any:
+    """Read-only version of a decoded json object:
+    dicts become mapping proxies and lists become tuples.
+    """
+    if isinstance(obj, dict):
+        return MappingProxyType({k: freeze_json(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(freeze_json(v) for v in obj)
+    return obj
+
+
+def json_size(obj: Any) -> int:
+    """Approximate memory used by a decoded json object, in bytes.
+    Shared strings are counted every time, so it rather overestimates.
+    """
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += sys.getsizeof(key) + json_size(value)
+    elif isinstance(obj, list):
+        for value in obj:
+            size += json_size(value)
+    return size
+
+
+class BaseCache(ABC):
+    """Interface of the response cache used by the sessions.
+    Implementations must not raise if a value can't be stored.
+    Expired values are kept for a while, so that they can be revalidated.
+    `AsyncSession` calls the methods of `blocking` caches,
+    which wait for disk or network, in a thread.
+    """
+
+    blocking = False
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Value of `key`, `default` if there is none or it has expired."""
+        value, stale_for = self.get_stale(key, NaN)
+        if value is NaN or stale_for > 0:
+            return default
+        return value
+
+    @abstractmethod
+    def get_stale(self, key: Hashable,
+                  default: Any = None) -> Tuple[Any, float]:
+        """Value of `key`, even if it has expired,
+        and how many seconds ago it expired (not positive if it has not).
+        """
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any,
+            ttl: Optional[NUMBER] = None) -> None:
+        """Store `value` for `ttl` seconds, or for the default ttl of
+        the cache if `ttl` is None. Nothing is stored if `ttl` <= 0.
+        """
+
+    @abstractmethod
+    def delete(self, key: Hashable) -> None:
+        """Remove `key`, if it is stored."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries."""
+
+    def close(self) -> None:
+        pass
+
+
+def _item_size(item: Tuple[float, Any]) -> int:
+    _, value = item
+    size = getattr(value, "size", None)
+    if size is None:
+        return len(value)
+    return size
+
+
+class MemoryCache(BaseCache):
+    """In-memory LRU cache of at most `maxsize` entries,
+    or, if `max_bytes` is given, of entries with at most that total size.
+    The size of a value is its `size` attribute or its length.
+    Entries are removed `keep_stale` seconds after they expire,
+    so that they do not take the place of live ones.
+    Can be shared between threads.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: NUMBER = 60,
+                 max_bytes: Optional[int] = None,
+                 keep_stale: NUMBER = 0) -> None:
+        self.ttl = ttl
+        self.keep_stale = keep_stale
+        # even reads reorder the lru
+        self._lock = threading.Lock()
+        if max_bytes is None:
+            self._cache = LRUCache(maxsize=maxsize)
+        else:
+            self._cache = LRUCache(maxsize=max_bytes, getsizeof=_item_size)
+
+        # heap of (removal time, insertion number, key)
+        self._removals = []
+        self._counter = count()
+
+    def _purge(self, now: float) -> None:
+        removals = self._removals
+        cache = self._cache
+        while removals and removals[0][0] <= now:
+            _, _, key = heapq.heappop(removals)
+            if key in cache:
+                # without moving the entry in the lru
+                expires, _ = Cache.__getitem__(cache, key)
+                if expires + self.keep_stale <= now:
+                    del cache[key]
+
+        # entries that were replaced or evicted leave their records behind
+        if len(removals) > 2 * len(cache) + 1024:
+            removals.clear()
+            for key in cache:
+                expires, _ = Cache.__getitem__(cache, key)
+                removals.append(
+                    (expires + self.keep_stale, next(self._counter), key))
+            heapq.heapify(removals)
+
+    @property
+    def currsize(self) -> int:
+        """Number of entries or their total size if `max_bytes` is set."""
+        return self._cache.currsize
+
+    def get_stale(self, key: Hashable,
+                  default: Any = None) -> Tuple[Any, float]:
+        with self._lock:
+            item = self._cache.get(key, NaN)
+        if item is NaN:
+            return default, 0.0
+
+        expires, value = item
+        stale_for = time.monotonic() - expires
+        if stale_for > self.keep_stale:
+            return default, 0.0
+        return value, stale_for
+
+    def set(self, key: Hashable, value: Any,
+            ttl: Optional[NUMBER] = None) -> None:
+        if ttl is None:
+            ttl = self.ttl
+        if ttl <= 0:
+            return
+
+        now = time.monotonic()
+        expires = now + ttl
+        with self._lock:
+            self._purge(now)
+            try:
+                self._cache[key] = (expires, value)
+            except ValueError:
+                return  # value too large
+
+            heapq.heappush(self._removals, (
+                expires + self.keep_stale, next(self._counter), key))
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._removals.clear()
+
+
+class SQLiteCache(BaseCache):
+    """Cache of `CacheEntry` values stored in an sqlite database at `path`.
+    The entries and their expiration times survive restarts,
+    and processes on one host can share the same file.
+    Bodies and validators are stored as plain columns,
+    nothing read from the file is unpickled, other values are not stored.
+    Entries are removed `keep_stale` seconds after they expire.
+    """
+
+    blocking = True
+
+    # how many `set` calls pass between removals of expired entries
+    purge_every = 256
+
+    def __init__(self, path: str, ttl: NUMBER = 60,
+                 timeout: NUMBER = 5,
+                 keep_stale: NUMBER = 24 * 60 * 60) -> None:
+        self.ttl = ttl
+        self.keep_stale = keep_stale
+        self._lock = threading.Lock()
+        self._sets = 0
+
+        self._db = sqlite3.connect(
+            path, timeout=timeout, isolation_level=None,
+            check_same_thread=False)
+        with self._lock:
+            # write-ahead log lets readers work while another process writes
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, data BLOB, etag TEXT, "
+                "last_modified TEXT, expires REAL)")
+
+    @staticmethod
+    def _key(key: Hashable) -> str:
+        if isinstance(key, str):
+            return key
+        # do not write api keys and such in plain text
+        return hashlib.sha256(repr(key).encode()).hexdigest()
+
+    def get_stale(self, key: Hashable,
+                  default: Any = None) -> Tuple[Any, float]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data, etag, last_modified, expires FROM responses "
+                "WHERE key = ?", (self._key(key),)).fetchone()
+
+        if row is None:
+            return default, 0.0
+
+        *entry, expires = row
+        return CacheEntry(*entry), time.time() - expires
+
+    def set(self, key: Hashable, value: Any,
+            ttl: Optional[NUMBER] = None) -> None:
+        if ttl is None:
+            ttl = self.ttl
+        if ttl <= 0 or not isinstance(value, CacheEntry):
+            return
+
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (self._key(key), value.data, value.etag,
+                 value.last_modified, now + ttl))
+
+            self._sets += 1
+            if self._sets >= self.purge_every:
+                self._sets = 0
+                self._db.execute(
+                    "DELETE FROM responses WHERE expires <= ?",
+                    (now - self.keep_stale,))
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM responses WHERE key = ?", (self._key(key),))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
 def async_cachedmethod(key=keys.hashkey, lock=None):
     """Decorator to wrap a class or instance method with a memoizing
     callable that saves results in a cache.
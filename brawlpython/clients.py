@@ -2,20 +2,28 @@
 
 import asyncio
 
+from aiohttp import TCPConnector
+
 from .api import (
     default_api_dict, API, KINDS, KIND_VALS, KIND_KEYS,
     OFFIC, CHI, STAR, OFFICS, UNOFFICS,
 )
 from .api_toolkit import rearrange_params, _rearrange_args
 from .base_classes import AsyncInitObject, AsyncWith, SyncWith
-from .cache_utils import iscorofunc
+from .cache_utils import iscorofunc, BaseCache
+from .exceptions import InvalidTag
+from .lazy_json import LazyArray
 from .sessions import AsyncSession, SyncSession
 
+from concurrent.futures import ThreadPoolExecutor
 from configparser import ConfigParser
+from contextvars import ContextVar
+from copy import copy
 from functools import update_wrapper
 from types import TracebackType
 from typing import (
     Any,
+    AsyncIterator,
     Callable,
     Coroutine,
     Dict,
@@ -33,7 +41,8 @@ from typing import (
     Union,
 )
 from .typedefs import (STRS, JSONSEQ, JSONS, HANDLER,
-                       NUMBER, INTSTR, BOOLS, STRDICT, AKW)
+                       NUMBER, NUMBERS, INTSTR, BOOLS, STRDICT, AKW)
+import random
 import time
 
 __all__ = (
@@ -45,15 +54,23 @@ __all__ = (
 
 
 COLLECT = "collect"
-RELEASE = "release"
 DEFAULT = "default"
 
+# requests collected by every client in the current task, None for
+# the ones collected by the session and the exception for the ones
+# that could not be built, replaced instead of changed, as in the sessions
+_collected = ContextVar("collected", default={})
+
 
 def offic_gets_handler(data_list: JSONSEQ) -> JSONSEQ:
     results = []
     for data in data_list:
+        if isinstance(data, Exception):
+            results.append(data)
+            continue
+
         get_items = data.get("items")
-        if get_items is not None and isinstance(get_items, list):
+        if isinstance(get_items, (list, tuple, LazyArray)):
             results.append(get_items)
         else:
             results.append(data)
@@ -63,7 +80,12 @@ def offic_gets_handler(data_list: JSONSEQ) -> JSONSEQ:
 def star_gets_handler(data_list: JSONSEQ) -> JSONSEQ:
     results = []
     for data in data_list:
-        data.pop("status", None)
+        if isinstance(data, Exception):
+            results.append(data)
+            continue
+
+        # a new dict, so frozen cached data is not modified
+        data = {k: v for k, v in data.items() if k != "status"}
         if len(data) == 1:
             results += list(data.values())
         else:
@@ -86,25 +108,64 @@ def gets_handler(self, data_list: JSONSEQ) -> JSONSEQ:
     return res
 
 
+# the fields of the saves that are indexed when they are updated
+INDEXED_FIELDS = ("id", "name")
+
+
+def _index_key(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.upper()
+    return value
+
+
+def _index_field(collectable: JSONSEQ, field: str) -> Dict[Any, JSONS]:
+    index = {}
+    for part in collectable:
+        value = part.get(field)
+        try:
+            # the first part with the value wins, as with a linear search
+            index.setdefault(_index_key(value), part)
+        except TypeError:
+            pass  # unhashable values can't be found anyway
+    return index
+
+
+def _set_saves(self, saves: Dict[str, JSONSEQ]) -> None:
+    # the indexes are built before the saves are replaced,
+    # so lookups never see saves without their indexes
+    indexes = {**self._save_indexes}
+    for kind, collectable in saves.items():
+        indexes[kind] = {field: _index_field(collectable, field)
+                         for field in INDEXED_FIELDS}
+
+    self._save_indexes = indexes
+    self._saves = {**self._saves, **saves}
+    self._last_update = time.time()
+
+
 def _find_save(self, kind: str, match: INTSTR,
                parameter: str = None) -> Optional[JSONS]:
+    """Find a saved part by its position, its `parameter` field
+    or, if there is no `parameter`, by its id or name.
+    Strings are compared case-insensitively.
+    """
     collectable = self._saves[kind]
     count = len(collectable)
 
-    if isinstance(match, int):
-        if -count <= match < count:
-            return collectable[match]
-    elif isinstance(match, str):
-        match = match.upper()
+    if isinstance(match, int) and -count <= match < count:
+        return collectable[match]
 
-    if parameter is None:
-        for part in collectable:
-            if match in part.values():
-                return part
-    else:
-        for part in collectable:
-            if part.get(parameter) == match:
-                return part
+    indexes = self._save_indexes.setdefault(kind, {})
+    fields = INDEXED_FIELDS if parameter is None else (parameter,)
+    match = _index_key(match)
+    for field in fields:
+        index = indexes.get(field)
+        if index is None:
+            index = indexes[field] = _index_field(collectable, field)
+
+        part = index.get(match)
+        if part is not None:
+            return part
 
     return None  # returns explicitly
 
@@ -136,8 +197,53 @@ def _rankings(self, kind: str, api: str,
     if key is None:
         key = ""
 
-    return ("rankings",), {"code": code, "kind": kind,
-                           "id": key, "limit": limit}
+    kwargs = {"code": code, "kind": kind, "id": key, "limit": limit}
+    return ("rankings", api), kwargs
+
+
+def _build_requests(self, paths: STRS, api_names: str,
+                    rearrange: bool = True,
+                    failed: Optional[Dict[int, InvalidTag]] = None,
+                    **kwargs) -> Tuple[STRS, JSONS, NUMBERS]:
+    """If `failed` is a dict, the requests with invalid tags are left out
+    and their exceptions are put in it by the index of the request.
+    """
+    if rearrange:
+        urls = []
+        headers = []
+        ttls = []
+        pars = rearrange_params(api_names, paths, **kwargs)
+
+        for i, ((api_name, path, *a), kw) in enumerate(pars):
+            api = self._get_api(api_name)
+
+            try:
+                urls.append(api.make_url(path, *a, **kw))
+            except InvalidTag as exc:
+                if failed is None:
+                    raise
+                failed[i] = exc
+                continue
+            headers.append(api.headers)
+            ttls.append(self._cache_ttls.get(path, api.get_ttl(path)))
+    else:
+        api = self._get_api(api_names)
+
+        urls = api.make_url(paths, **kwargs)
+        headers = api.headers
+        ttls = self._cache_ttls.get(paths, api.get_ttl(paths))
+
+    return urls, headers, ttls
+
+
+def _splice_failed(results: JSONSEQ,
+                   failed: Optional[Dict[int, InvalidTag]]) -> JSONSEQ:
+    # the requests that were not sent take their places among the results
+    if failed:
+        results = list(results)
+        for i in sorted(failed):
+            results.insert(i, failed[i])
+    return results
 
 
 def get_and_apply_api_keys(filename: str, section: str,
@@ -176,77 +282,177 @@ class AsyncClient(AsyncInitObject, AsyncWith):
             cache_limit: int = 1024,
             use_cache: bool = True,
             timeout: NUMBER = 30,
-            repeat_failed: int = 3) -> None:
-
-        self.session = await AsyncSession(
-            trust_env=trust_env, cache_ttl=cache_ttl,
-            cache_limit=cache_limit, use_cache=use_cache,
-            timeout=timeout, repeat_failed=repeat_failed)
-
-        self.api_dict = {**default_api_dict, **api_dict}
+            repeat_failed: int = 3,
+            rate_limit: Optional[NUMBER] = None,
+            rate_burst: int = 1,
+            rate_limits: Dict[str, Tuple[NUMBER, int]] = {},
+            max_concurrency: Optional[int] = None,
+            return_exceptions: bool = False,
+            connector: Optional[TCPConnector] = None,
+            connections_limit: int = 100,
+            connections_limit_per_host: int = 0,
+            dns_cache_ttl: Optional[int] = 10,
+            keepalive_timeout: NUMBER = 15,
+            cache_per_key: bool = False,
+            cache: Optional[BaseCache] = None,
+            cache_decoded: Optional[str] = None,
+            cache_max_bytes: Optional[int] = None,
+            cache_ttls: Dict[str, NUMBER] = {},
+            cache_control: bool = True,
+            cache_revalidate: NUMBER = 60 * 10,
+            stale_while_revalidate: NUMBER = 0,
+            lazy_json: bool = False,
+            session: Optional[AsyncSession] = None,
+            refresh_interval: Optional[NUMBER] = None,
+            refresh_jitter: NUMBER = 0.1) -> None:
+        """If `refresh_interval` is given, a background task refreshes
+        the saves and the hot keys about every `refresh_interval` seconds,
+        give or take `refresh_jitter` of it.
+        """
+        if refresh_interval is not None and refresh_interval <= 0:
+            raise ValueError("refresh_interval must be positive")
+        if not 0 <= refresh_jitter < 1:
+            raise ValueError("refresh_jitter must be in [0, 1)")
+
+        # clients can share one session (its pool, cache and limiters),
+        # then the session options above are ignored
+        self._own_session = session is None
+        if self._own_session:
+            session = await AsyncSession(
+                trust_env=trust_env, cache_ttl=cache_ttl,
+                cache_limit=cache_limit, use_cache=use_cache,
+                timeout=timeout, repeat_failed=repeat_failed,
+                rate_limit=rate_limit, rate_burst=rate_burst,
+                max_concurrency=max_concurrency, connector=connector,
+                connections_limit=connections_limit,
+                connections_limit_per_host=connections_limit_per_host,
+                dns_cache_ttl=dns_cache_ttl,
+                keepalive_timeout=keepalive_timeout,
+                cache_per_key=cache_per_key, cache=cache,
+                cache_decoded=cache_decoded,
+                cache_max_bytes=cache_max_bytes,
+                cache_control=cache_control,
+                cache_revalidate=cache_revalidate,
+                stale_while_revalidate=stale_while_revalidate,
+                lazy_json=lazy_json)
+        self.session = session
+        self._closed = False
+
+        # copies, so that the api keys of one client stay with it
+        self.api_dict = {
+            name: copy(api)
+            for name, api in {**default_api_dict, **api_dict}.items()}
         get_and_apply_api_keys(config_file_name, section, self.api_dict)
+
+        for name, limit in rate_limits.items():
+            self.session.set_rate_limit(self.api_dict[name].base, *limit)
         self._current_api = self._default_api = default_api
 
+        # endpoint name -> how long its responses stay in the cache,
+        # overrides the ttls of the apis
+        self._cache_ttls = cache_ttls
         self._return_unit = return_unit
+        self._return_exceptions = return_exceptions
         self._gets_handler = data_handler
         self._requests = []
         self._mode = DEFAULT
 
         self._saves = {}
+        self._save_indexes = {}
         self._min_update_time = min_update_time
+        self._last_update = 0.0
+        self._hot_keys = {}
+        self._refresher = None
         await self.update_saves(True)
 
+        if refresh_interval is not None:
+            self._refresher = asyncio.ensure_future(
+                self._refresh_loop(refresh_interval, refresh_jitter))
+
     async def close(self) -> None:
-        """Close session"""
-        await self.session.close()
+        """Close session, unless it is shared"""
+        self._closed = True
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+
+        if self._own_session:
+            await self.session.close()
 
     @property
     def closed(self) -> bool:
         """Is client session closed.
         A readonly property.
         """
-        return self.session.closed
+        return self._closed or self.session.closed
 
-    async def _gets(self, *args) -> JSONSEQ:
-        # not_collect =
+    async def _gets(self, urls: STRS, from_json: BOOLS, headers: JSONS,
+                    ttls: NUMBERS,
+                    failed: Optional[Dict[int, InvalidTag]] = None
+                    ) -> JSONSEQ:
 
-        resps = await self.session.gets(*args)
+        resps = await self.session.gets(
+            urls, from_json, headers, self._return_exceptions, ttls)
         if self.session.mode != COLLECT:
-            return self._gets_handler(resps)
-        if self.session.mode == RELEASE:
-            return resps  # None
+            return self._gets_handler(self, _splice_failed(resps, failed))
+
+        rows = _collected.get().get(self)
+        if rows is not None:
+            failed = failed or {}
+            count = 1 if isinstance(urls, str) else len(urls) + len(failed)
+            rows.extend(failed.get(i) for i in range(count))
 
     def _get_api(self, api: str):
         return self.api_dict[api]
 
+    _make_requests = _build_requests
+
     async def _fetchs(self, paths: STRS, api_names: str,
                       from_json: BOOLS = True, rearrange: bool = True,
                       **kwargs) -> JSONS:
 
-        if rearrange:
-            urls = []
-            headers = []
-            pars = rearrange_params(api_names, paths, **kwargs)
+        # with return_exceptions an invalid tag fails only its request
+        failed = {} if self._return_exceptions else None
+        urls, headers, ttls = self._make_requests(
+            paths, api_names, rearrange, failed, **kwargs)
 
-            for (api_name, *a), kw in pars:
-                api = self._get_api(api_name)
+        return await self._gets(urls, from_json, headers, ttls, failed)
 
-                urls.append(api.make_url(*a, **kw))
-                headers.append(
-                    (api.headers))  # self.session.headers_handler
-        else:
-            api = self._get_api(api_names)
+    async def _iter_fetchs(
+            self, paths: STRS, api_names: str, from_json: BOOLS = True,
+            **kwargs) -> AsyncIterator[Tuple[int, JSONS]]:
 
-            urls = api.make_url(paths, **kwargs)
-            headers = self.session.headers_handler(api.headers)
+        failed = {} if self._return_exceptions else None
+        urls, headers, ttls = self._make_requests(
+            paths, api_names, True, failed, **kwargs)
 
-        return await self._gets(urls, from_json, headers)
+        # the handler gets every result as a batch of one
+        failed = failed or {}
+        for i, exc in failed.items():
+            yield i, self._gets_handler(self, [exc])
+
+        indexes = [i for i in range(len(urls) + len(failed))
+                   if i not in failed]
+        async for i, data in self.session.iter_gets(
+                urls, from_json, headers, self._return_exceptions, ttls):
+            yield indexes[i], self._gets_handler(self, [data])
 
     def collect(self):
+        _collected.set({**_collected.get(), self: []})
         self.session.collect()
 
     async def release(self):
-        return self._gets_handler(await self.session.release())
+        collected = dict(_collected.get())
+        rows = collected.pop(self, [])
+        _collected.set(collected)
+
+        results = await self.session.release(self._return_exceptions)
+        failed = {i: exc for i, exc in enumerate(rows) if exc is not None}
+        return self._gets_handler(self, _splice_failed(results, failed))
 
     # @add_api_name(None)
     async def test_fetch(self, *args, **kwargs):
@@ -265,6 +471,22 @@ class AsyncClient(AsyncInitObject, AsyncWith):
                       api: str = OFFIC) -> JSONS:
         return await self._fetchs("members", api, tag=tag, limit=limit)
 
+    def iter_players(self, tag: STRS, api: str = OFFIC
+                     ) -> AsyncIterator[Tuple[int, JSONS]]:
+        return self._iter_fetchs("players", api, tag=tag)
+
+    def iter_battlelog(self, tag: STRS, api: str = OFFIC
+                       ) -> AsyncIterator[Tuple[int, JSONS]]:
+        return self._iter_fetchs("battlelog", api, tag=tag)
+
+    def iter_clubs(self, tag: STRS, api: str = OFFIC
+                   ) -> AsyncIterator[Tuple[int, JSONS]]:
+        return self._iter_fetchs("clubs", api, tag=tag)
+
+    def iter_members(self, tag: STRS, limit: INTSTR = 100,
+                     api: str = OFFIC) -> AsyncIterator[Tuple[int, JSONS]]:
+        return self._iter_fetchs("members", api, tag=tag, limit=limit)
+
     async def rankings(self, kind: str,
                        key: Optional[INTSTR] = None,
                        code: str = "global",
@@ -309,22 +531,74 @@ class AsyncClient(AsyncInitObject, AsyncWith):
 
     # TODO: api rearrange
     async def update_saves(self, now: bool = False, api: str = OFFIC) -> None:
+        if not now and self._refresher is not None:
+            return  # the background task keeps the saves up to date
+
         if now or time.time() - self._last_update >= self._min_update_time:
             self.collect()
             await self.brawlers(api=api)
             await self.powerplay(api=api)
             b, ps = await self.release()
-            self._saves.update({"b": b, "ps": ps})
-            self._last_update = time.time()
+            for res in b, ps:
+                if isinstance(res, Exception):
+                    raise res
+            self.set_saves({"b": b, "ps": ps})
+
+    def add_hot_key(self, path: str, api: str = OFFIC,
+                    **kwargs: Any) -> None:
+        """Register requests that the background task keeps fresh,
+        e.g. `add_hot_key("clubs", tag=top_club_tags)`.
+        Raises `InvalidTag` if a tag is invalid.
+        """
+        urls, headers, ttls = self._make_requests(path, api, **kwargs)
+        for url, hdrs, ttl in zip(urls, headers, ttls):
+            self._hot_keys[url] = (hdrs, ttl)
+
+    def remove_hot_key(self, path: str, api: str = OFFIC,
+                       **kwargs: Any) -> None:
+        urls, _, _ = self._make_requests(path, api, **kwargs)
+        for url in urls:
+            self._hot_keys.pop(url, None)
+
+    async def refresh(self, api: str = OFFIC) -> None:
+        """Fetch the saves and the hot keys again and update the saves."""
+        urls, headers, ttls = self._make_requests("brawlers", api, id="")
+        powerplay = self._make_requests(
+            "rankings", api, code="global", limit=200, kind=KINDS["ps"])
+        for requests, more in zip((urls, headers, ttls), powerplay):
+            requests += more
+
+        for url, (hdrs, ttl) in list(self._hot_keys.items()):
+            urls.append(url)
+            headers.append(hdrs)
+            ttls.append(ttl)
+
+        await self.session.prefetch(urls, headers, ttls)
+        # the saves come from the fresh cache
+        await self.update_saves(True, api)
+
+    async def _refresh_loop(self, interval: NUMBER, jitter: NUMBER) -> None:
+        while True:
+            # jitter, so that many clients do not refresh all at once
+            await asyncio.sleep(
+                interval * random.uniform(1 - jitter, 1 + jitter))
+            try:
+                await self.refresh()
+            except Exception:
+                pass  # keep the old saves, the next round tries again
+
+    set_saves = _set_saves
 
     find_save = _find_save
 
 
 class SyncClient(SyncWith):
+    _gets_handler = gets_handler
+
     def __init__(
-            self, api_keys: Union[str, STRDICT],
+            self, api_keys: Union[str, STRDICT, None] = None,
             api_dict: Dict[str, API] = {},
-            # default_api: str = OFFIC,
+            default_api: str = OFFIC,
             return_unit: bool = True,
             min_update_time: NUMBER = 60 * 10,
             data_handler: HANDLER = gets_handler,
@@ -334,27 +608,58 @@ class SyncClient(SyncWith):
             cache_limit: int = 1024,
             use_cache: bool = True,
             timeout: NUMBER = 30,
-            repeat_failed: int = 3) -> None:
+            repeat_failed: int = 3,
+            return_exceptions: bool = False,
+            max_workers: int = 10,
+            executor: Optional[ThreadPoolExecutor] = None,
+            connections_limit: Optional[int] = None,
+            cache_per_key: bool = False,
+            cache: Optional[BaseCache] = None,
+            cache_decoded: Optional[str] = None,
+            cache_max_bytes: Optional[int] = None,
+            cache_ttls: Dict[str, NUMBER] = {},
+            cache_control: bool = True,
+            cache_revalidate: NUMBER = 60 * 10,
+            lazy_json: bool = False) -> None:
+        """`api_keys` is the key of `default_api` or a dict
+        of api names and their keys.
+        Batches run on `max_workers` threads, see `SyncSession`.
+        """
 
         self.session = SyncSession(
             trust_env=trust_env, cache_ttl=cache_ttl,
             cache_limit=cache_limit, use_cache=use_cache,
-            timeout=timeout, repeat_failed=repeat_failed
-        )
-        self.api_dict = {**default_api_dict, **api_dict}
-        # self._current_api = self._default_api = default_api
+            timeout=timeout, repeat_failed=repeat_failed,
+            max_workers=max_workers, executor=executor,
+            connections_limit=connections_limit,
+            cache_per_key=cache_per_key, cache=cache,
+            cache_decoded=cache_decoded, cache_max_bytes=cache_max_bytes,
+            cache_control=cache_control, cache_revalidate=cache_revalidate,
+            lazy_json=lazy_json)
+
+        # copies, so that the api keys of one client stay with it
+        self.api_dict = {
+            name: copy(api)
+            for name, api in {**default_api_dict, **api_dict}.items()}
+        self._current_api = self._default_api = default_api
 
         if isinstance(api_keys, str):
-            self.api_dict[default_api].set_api_key(api_keys)
-        else:
-            for name, api_key in api_keys.items():
-                self.api_dict[name].set_api_key(api_key)
+            api_keys = {default_api: api_keys}
+        elif api_keys is None:
+            api_keys = {}
 
+        for name, api_key in api_keys.items():
+            self.api_dict[name].set_api_key(api_key)
+
+        self._cache_ttls = cache_ttls
         self._return_unit = return_unit
+        self._return_exceptions = return_exceptions
         self._gets_handler = data_handler
 
         self._saves = {}
+        self._save_indexes = {}
         self._min_update_time = min_update_time
+        self._last_update = 0.0
         self.update_saves(True)
 
     def close(self) -> None:
@@ -368,109 +673,101 @@ class SyncClient(SyncWith):
         """
         return self.session.closed
 
-    def _gets(self, *args: Any, **kwargs: Any) -> JSONSEQ:
-        resps = self.session.gets(*args, **kwargs)
-        return self._gets_handler(self, resps)
-
-    def _get_api(self):
-        if self._current_api is None:
-            self._current_api = self._default_api
+    def _gets(self, urls: STRS, from_json: BOOLS, headers: JSONS,
+              ttls: NUMBERS,
+              failed: Optional[Dict[int, InvalidTag]] = None) -> JSONSEQ:
 
-        return self.api_dict[self._current_api]
+        resps = self.session.gets(
+            urls, from_json, headers, self._return_exceptions, ttls)
+        return self._gets_handler(self, _splice_failed(resps, failed))
 
-    def _fetch(self, path: str, from_json: bool = True,
-               **kwargs: Any) -> JSONS:
-
-        api = self._get_api()
+    def _get_api(self, api: str):
+        return self.api_dict[api]
 
-        return self._gets(
-            api.get(path, **kwargs), headers=api.headers, from_json=from_json)
+    _make_requests = _build_requests
 
-    def _fetchs(self, paths: Union[STRS, AKW], from_json: BOOLS = True,
-                rearrange: bool = True, **kwargs: Any) -> JSONS:
+    def _fetchs(self, paths: STRS, api_names: str,
+                from_json: BOOLS = True, rearrange: bool = True,
+                **kwargs) -> JSONS:
 
-        api = self._get_api()
+        # with return_exceptions an invalid tag fails only its request
+        failed = {} if self._return_exceptions else None
+        urls, headers, ttls = self._make_requests(
+            paths, api_names, rearrange, failed, **kwargs)
 
-        if rearrange:
-            pars = rearrange_params(paths, **kwargs)
-        else:
-            pars = paths
-        urls = [api.get(*a, **kw) for a, kw in pars]
+        return self._gets(urls, from_json, headers, ttls, failed)
 
-        return self._gets(urls, headers=api.headers, from_json=from_json)
-
-    # @add_api_name(None)
     def test_fetch(self, *args, **kwargs):
         return self._fetchs(*args, **kwargs)
 
-    # @add_api_name(OFFIC)
-    def players(self, tag: str) -> JSONS:
-        return self._fetchs("players", tag=tag)
+    def players(self, tag: str, api: str = OFFIC) -> JSONS:
+        return self._fetchs("players", api, tag=tag)
 
-    # @add_api_name(OFFIC)
-    def battlelog(self, tag: str) -> JSONS:
-        return self._fetchs("battlelog", tag=tag)
+    def battlelog(self, tag: str, api: str = OFFIC) -> JSONS:
+        return self._fetchs("battlelog", api, tag=tag)
 
-    # @add_api_name(OFFIC)
-    def clubs(self, tag: str) -> JSONS:
-        return self._fetchs("clubs", tag=tag)
+    def clubs(self, tag: str, api: str = OFFIC) -> JSONS:
+        return self._fetchs("clubs", api, tag=tag)
 
-    # @add_api_name(OFFIC)
-    def members(self, tag: str, limit: INTSTR = 100) -> JSONS:
-        return self._fetchs("members", tag=tag, limit=limit)
+    def members(self, tag: str, limit: INTSTR = 100,
+                api: str = OFFIC) -> JSONS:
+        return self._fetchs("members", api, tag=tag, limit=limit)
 
-    # @add_api_name(OFFIC)
     def rankings(self, kind: str,
                  key: Optional[INTSTR] = None,
                  code: str = "global",
-                 limit: INTSTR = 200) -> JSONS:
-        pars = rearrange_params(
-            kind, key=key, code=code, limit=limit)
+                 limit: INTSTR = 200,
+                 api: str = OFFIC) -> JSONS:
+
+        pars = rearrange_params(kind, api, key=key, code=code, limit=limit)
+
+        # all the rankings go to the session as one batch
+        urls, headers, ttls = [], [], []
+        for args, kwargs in pars:
+            a, kw = _rankings(self, *args, **kwargs)
+            url, hdrs, ttl = self._make_requests(*a, rearrange=False, **kw)
+            urls.append(url)
+            headers.append(hdrs)
+            ttls.append(ttl)
 
-        return self._fetchs(
-            [_rankings(self, *a, **kw) for a, kw in pars], rearrange=False)
+        return self._gets(urls, True, headers, ttls)
 
-    # @add_api_name(OFFIC)
-    def brawlers(self, id: INTSTR = "",
-                 limit: INTSTR = "") -> JSONS:
-        return self._fetchs("brawlers", id=id, limit=limit)
+    def brawlers(self, id: INTSTR = "", limit: Optional[INTSTR] = None,
+                 api: str = OFFIC) -> JSONS:
+        return self._fetchs("brawlers", api, id=id, limit=limit)
 
-    # @add_api_name(OFFIC)
-    def powerplay(self, code: str = "global", limit: int = 200) -> JSONS:
-        return self._fetchs("rankings", code=code, limit=limit,
-                            kind=KINDS["ps"], id="")
+    def powerplay(self, code: str = "global", limit: int = 200,
+                  api: str = OFFIC) -> JSONS:
+        return self._fetchs("rankings", api, code=code, limit=limit,
+                            kind=KINDS["ps"])
 
-    # @add_api_name(STAR)
-    def events(self) -> JSONS:
-        return self._fetchs("events")
+    def events(self, api: str = STAR) -> JSONS:
+        return self._fetchs("events", api)
 
-    # @add_api_name(STAR)
-    def icons(self) -> JSONS:
-        return self._fetchs("icons")
+    def icons(self, api: str = STAR) -> JSONS:
+        return self._fetchs("icons", api)
 
-    # @add_api_name(STAR)
-    async def maps(self, id: INTSTR = "") -> JSONS:
-        return self._fetchs("maps", id=id)
+    def maps(self, id: INTSTR = "", api: str = STAR) -> JSONS:
+        return self._fetchs("maps", api, id=id)
 
-    # @add_api_name(STAR)
-    def gamemodes(self) -> JSONS:
-        return self._fetchs("gamemodes")
+    def gamemodes(self, api: str = STAR) -> JSONS:
+        return self._fetchs("gamemodes", api)
 
-    # @add_api_name(STAR)
-    def clublog(self, tag: str) -> JSONS:
-        return self._fetchs("clublog", tag=tag)
+    def clublog(self, tag: str, api: str = STAR) -> JSONS:
+        return self._fetchs("clublog", api, tag=tag)
 
-    # @add_api_name(STAR)
-    def translations(self, code: str = "") -> JSONS:
-        return self._fetchs("translations", code=code)
+    def translations(self, code: str = "", api: str = STAR) -> JSONS:
+        return self._fetchs("translations", api, code=code)
 
-    # @add_api_name(OFFIC)
-    def update_saves(self, now: bool = False) -> None:
+    def update_saves(self, now: bool = False, api: str = OFFIC) -> None:
         if now or time.time() - self._last_update >= self._min_update_time:
-            self._saves.update({
-                "b": self.brawlers(api=self._current_api),
-                "ps": self.powerplay(api=self._current_api)
-            })
-            self._last_update = time.time()
+            b = self.brawlers(api=api)
+            ps = self.powerplay(api=api)
+            for res in b, ps:
+                if isinstance(res, Exception):
+                    raise res
+            self.set_saves({"b": b, "ps": ps})
+
+    set_saves = _set_saves
 
     find_save = _find_save
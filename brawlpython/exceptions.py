@@ -4,6 +4,7 @@ from typing import Any
 
 __all__ = (
     "ClientException",
+    "InvalidTag",
 
     "ClientResponseError",
     "UnexpectedResponseCode",
@@ -16,6 +17,22 @@ class ClientException(Exception):
     """Base class for all client exceptions."""
 
 
+class InvalidTag(ClientException, ValueError):
+    """Tag has characters that tags of the game never have,
+    so the request is not sent.
+    """
+
+    def __init__(self, tag: str):
+        self.tag = tag
+        super().__init__(tag)
+
+    def __repr__(self):
+        return "{0.__class__.__name__}({0.tag!r})".format(self)
+
+    def __str__(self):
+        return "invalid tag {0.tag!r}".format(self)
+
+
 class ClientResponseError(ClientException):
     """Connection error during reading response."""
 
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+
+import re
+import sys
+from collections.abc import Mapping, Sequence
+
+from .cache_utils import NaN
+from .typedefs import JSONVALS, STRBYTE
+
+from typing import Any, Dict, Iterator, List, Tuple
+
+try:
+    import orjson as json
+except ImportError:
+    try:
+        import ujson as json
+    except ImportError:
+        import json
+
+__all__ = (
+    "LazyJSON",
+    "LazyArray")
+
+
+# possessive repeats do not keep backtracking state, which makes
+# the scan about a third faster where they are supported
+_MANY = rb"*+" if sys.version_info >= (3, 11) else rb"*"
+
+# the document is scanned as utf-8 bytes, the structural characters
+# are ascii and never appear inside multibyte characters
+_WS = rb"[ \t\n\r]*"
+_STRING_RE = (rb'"[^"\\]' + _MANY
+              + rb'(?:\\.[^"\\]' + _MANY + rb")" + _MANY + rb'"')
+_SCALAR_RE = (
+    rb"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?|true|false|null")
+
+
+def _nested(depth: int) -> bytes:
+    # contents of a container with at most `depth` levels of nesting,
+    # the loop is unrolled, so a failed match does not backtrack
+    other = rb'[^"\[\]{}]' + _MANY
+    inner = rb"(?!)"
+    for _ in range(depth):
+        inner = (other + rb"(?:(?:" + _STRING_RE + rb"|\{" + inner
+                 + rb"\}|\[" + inner + rb"\])" + other + rb")" + _MANY)
+    return inner
+
+
+# a container is skipped by one match, api rows are rarely nested deeper
+_CONTAINER_RE = rb"\{" + _nested(6) + rb"\}|\[" + _nested(6) + rb"\]"
+
+_WHITESPACE = re.compile(_WS)
+_STRING = re.compile(_STRING_RE, re.DOTALL)
+_SCALAR = re.compile(_SCALAR_RE)
+_CONTAINER = re.compile(_CONTAINER_RE, re.DOTALL)
+_STRUCTURAL = re.compile(rb'["\[\]{}]')
+# an item of an array and the separator after it, the second group
+# matches if more items follow
+_ITEM = re.compile(
+    rb"(" + _STRING_RE + rb"|" + _CONTAINER_RE + rb"|" + _SCALAR_RE + rb")"
+    + _WS + rb"(?:(,)" + _WS + rb"|\])", re.DOTALL)
+
+
+def _skip_ws(data: bytes, pos: int) -> int:
+    return _WHITESPACE.match(data, pos).end()
+
+
+def _error(message: str, pos: int) -> ValueError:
+    return ValueError(f"{message}: char {pos}")
+
+
+def _skip_deep(data: bytes, pos: int) -> int:
+    # counts brackets one by one, for containers nested too deep
+    depth = 0
+    while True:
+        match = _STRUCTURAL.search(data, pos)
+        if match is None:
+            raise _error("Unterminated container", pos)
+
+        pos = match.start()
+        char = data[pos]
+        if char == 34:  # "
+            string = _STRING.match(data, pos)
+            if string is None:
+                raise _error("Unterminated string", pos)
+            pos = string.end()
+            continue
+
+        pos += 1
+        if char in b"[{":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return pos
+
+
+def _skip_value(data: bytes, pos: int) -> int:
+    """Find the end of the value at `pos` without decoding it.
+    Only strings, brackets and scalars are checked,
+    the rest of a value is checked when it is decoded.
+    """
+    char = data[pos:pos + 1]
+    if char == b'"':
+        match = _STRING.match(data, pos)
+        if match is None:
+            raise _error("Unterminated string", pos)
+        return match.end()
+
+    if char == b"{" or char == b"[":
+        match = _CONTAINER.match(data, pos)
+        if match is None:
+            return _skip_deep(data, pos)
+        return match.end()
+
+    match = _SCALAR.match(data, pos)
+    if match is None:
+        raise _error("Expecting value", pos)
+    return match.end()
+
+
+def _separator(data: bytes, pos: int, closing: bytes) -> Tuple[int, bool]:
+    pos = _skip_ws(data, pos)
+    char = data[pos:pos + 1]
+    if char == closing:
+        return pos + 1, True
+    if char != b",":
+        raise _error("Expecting ',' delimiter", pos)
+    return _skip_ws(data, pos + 1), False
+
+
+def _object_spans(
+        data: bytes, pos: int
+) -> Tuple[Dict[str, Tuple[int, int]], Dict[str, List[Tuple[int, int]]], int]:
+
+    # spans of the values and of the items of the array values
+    spans = {}
+    arrays = {}
+    pos = _skip_ws(data, pos + 1)
+    if data[pos:pos + 1] == b"}":
+        return spans, arrays, pos + 1
+
+    while True:
+        match = _STRING.match(data, pos)
+        if match is None:
+            raise _error("Expecting property name", pos)
+
+        key = match.group()
+        if b"\\" in key:
+            key = json.loads(key)
+        else:
+            key = key[1:-1].decode("utf-8")
+
+        pos = _skip_ws(data, match.end())
+        if data[pos:pos + 1] != b":":
+            raise _error("Expecting ':' delimiter", pos)
+
+        start = _skip_ws(data, pos + 1)
+        if data[start:start + 1] == b"[":
+            arrays[key], pos = _array_spans(data, start)
+        else:
+            pos = _skip_value(data, start)
+        spans[key] = start, pos
+
+        pos, end = _separator(data, pos, b"}")
+        if end:
+            return spans, arrays, pos
+
+
+def _array_spans(data: bytes,
+                 pos: int) -> Tuple[List[Tuple[int, int]], int]:
+    spans = []
+    pos = _skip_ws(data, pos + 1)
+    if data[pos:pos + 1] == b"]":
+        return spans, pos + 1
+
+    item = _ITEM.match
+    while True:
+        match = item(data, pos)
+        if match is None:
+            # nested too deep or invalid, the slow path tells which
+            end = _skip_value(data, pos)
+            spans.append((pos, end))
+            pos, last = _separator(data, end, b"]")
+        else:
+            spans.append(match.span(1))
+            pos = match.end()
+            last = match.lastindex == 1
+        if last:
+            return spans, pos
+
+
+class LazyArray(Sequence):
+    """Json array that decodes its items only when they are accessed.
+    The items are not kept, every access decodes them again.
+    """
+
+    __slots__ = "_data", "_spans"
+
+    def __init__(self, data: bytes, spans: List[Tuple[int, int]]) -> None:
+        self._data = data
+        self._spans = spans
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        start, end = self._spans[index]
+        return json.loads(self._data[start:end])
+
+    def __iter__(self) -> Iterator[JSONVALS]:
+        data = self._data
+        loads = json.loads
+        for start, end in self._spans:
+            yield loads(data[start:end])
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} of {len(self)} items>"
+
+
+class LazyJSON(Mapping):
+    """Json object that keeps the raw document
+    and decodes a field only when it is accessed for the first time.
+    Arrays are returned as `LazyArray`, so iterating over `items`
+    builds one row at a time.
+    The document is indexed without decoding the values,
+    so only its structure is checked until they are accessed.
+    Raises `ValueError` if the document is not a json object.
+    """
+
+    __slots__ = "_data", "_spans", "_arrays", "_values"
+
+    def __init__(self, data: STRBYTE) -> None:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        pos = _skip_ws(data, 0)
+        if data[pos:pos + 1] != b"{":
+            raise _error("Expecting an object", pos)
+
+        self._spans, self._arrays, pos = _object_spans(data, pos)
+        if _skip_ws(data, pos) != len(data):
+            raise _error("Extra data", pos)
+
+        self._data = data
+        self._values = {}
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._values.get(key, NaN)
+        if value is NaN:
+            start, end = self._spans[key]
+            if key in self._arrays:
+                value = LazyArray(self._data, self._arrays[key])
+            else:
+                value = json.loads(self._data[start:end])
+            self._values[key] = value
+        return value
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._spans)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._spans
+
+    def iter_items(self, key: str = "items") -> Iterator[JSONVALS]:
+        """Decode the items of the array `key` one by one."""
+        return iter(self[key])
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} with {list(self._spans)}>"
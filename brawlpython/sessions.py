@@ -3,11 +3,16 @@
 from aiohttp import ClientSession, TCPConnector, ClientTimeout
 import asyncio
 from asyncio import ensure_future as ensure, gather
-from cachetools import TTLCache
 from collections import defaultdict, OrderedDict
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import (
+    ThreadPoolExecutor, Future, wait, ALL_COMPLETED, FIRST_EXCEPTION)
+from contextvars import ContextVar
 from functools import update_wrapper, partial
 from requests import Session
+from requests.adapters import HTTPAdapter
+import threading
+import time
+from urllib.parse import urlsplit
 
 from .api_toolkit import (
     default_headers,
@@ -16,21 +21,28 @@ from .api_toolkit import (
     rearrange_params,
     rearrange_args,
     isliterals)
-from .base_classes import (AsyncInitObject, AsyncWith,
-                           SyncWith, DefaultOrderedDict, Mode)
-from .cache_utils import somecachedmethod, iscorofunc, NaN
+from .base_classes import AsyncInitObject, AsyncWith, SyncWith
+from .cache_utils import (
+    somecachedmethod, iscorofunc, NaN,
+    BaseCache, MemoryCache, CacheEntry, freeze_json, json_size, max_age)
 from .exceptions import WITH_CODE, UnexpectedResponseCode
+from .lazy_json import LazyJSON
+from .throttling import RetryPolicy, TokenBucket
 from .typedefs import (STRS, JSONSEQ, JSONTYPE, JSONS, ARGS,
-                       NUMBER, BOOLS, STRJSON, AKW, STRBYTE)
+                       NUMBER, NUMBERS, BOOLS, STRJSON, AKW, STRBYTE,
+                       STRDICT)
 
 from typing import (
     Any,
+    AsyncIterator,
     Callable,
     Coroutine,
     Dict,
     Generator,
     Generic,
+    Hashable,
     Iterable,
+    Iterator,
     List,
     Mapping,
     Optional,
@@ -56,22 +68,20 @@ __all__ = (
     "SyncSession")
 
 
-# FIXME: in both functions I need to find a suitable cache_limit
-# 1024 is a relatively random choice and
-# has nothing to do with the desired behavior
-
-retry_end = RuntimeError(
-    "self._attempts argument was changed"
-    " causing it to work incorrectly")
-
-not_scheduled = RuntimeError(
-    "scheduled function calls with these parameters have"
-    " already been executed, this call is not scheduled")
+# cache_limit counts responses whatever their size,
+# cache_max_bytes bounds the memory that they take instead
 
 COLLECT = "collect"
-RELEASE = "release"
 DEFAULT = "default"
-MODES = (DEFAULT, COLLECT, RELEASE)
+
+# parameters collected by every session in the current task,
+# a context var per session would keep the sessions alive in the contexts,
+# the dict is replaced instead of changed, so tasks never share it
+_collected = ContextVar("collected", default={})
+
+# a copy that callers could change would cost more than parsing again
+FROZEN = "frozen"
+DECODED_MODES = (None, FROZEN)
 
 
 def _raise_for_status(self, url: str, code: int,
@@ -109,58 +119,211 @@ def _headers_handler(self, headers: JSONS) -> STRBYTE:
         return dumps
 
 
-def loads_json(data: str, from_json: bool = True) -> STRJSON:
+def loads_json(data: STRBYTE, from_json: bool = True) -> STRJSON:
+    # all three json libraries parse bytes without decoding them first
     if from_json:
         try:
-            data = json.loads(data)
-        except json.JSONDecodeError:
+            return json.loads(data)
+        except ValueError:
             pass
 
+    if isinstance(data, bytes):
+        # the apis send utf-8
+        data = data.decode("utf-8", "replace")
+
     return data
 
 
+def loads_lazy(data: STRBYTE) -> STRJSON:
+    # arrays and invalid documents are loaded as usual
+    try:
+        return LazyJSON(data)
+    except ValueError:
+        return loads_json(data)
+
+
+def _loads_entry(self, data: Union[bytes, CacheEntry],
+                 from_json: bool = True) -> STRJSON:
+
+    if self._lazy_json and from_json:
+        if isinstance(data, CacheEntry):
+            data = data.data
+        return loads_lazy(data)
+
+    if not isinstance(data, CacheEntry):
+        return loads_json(data, from_json)
+
+    if self._cache_decoded is None or not from_json:
+        return loads_json(data.data, from_json)
+
+    if data.decoded is NaN:
+        _decode_entry(data)
+    return data.decoded
+
+
+def _decode_entry(entry: CacheEntry) -> None:
+    decoded = loads_json(entry.data)
+    # the cache's byte budget covers the parsed body as well
+    entry.size += json_size(decoded)
+    entry.decoded = freeze_json(decoded)
+
+
+def _response_ttl(self, ttl: Optional[NUMBER],
+                  resp_headers: STRDICT) -> Optional[NUMBER]:
+    if ttl is None and self._cache_control:
+        return max_age(resp_headers.get("Cache-Control"))
+    return ttl
+
+
+def _response_entry(self, code: int, data: bytes, resp_headers: STRDICT,
+                    stale: Optional[CacheEntry]) -> Optional[CacheEntry]:
+    """Entry to cache for a response, None if it can't be cached."""
+    if code == 304 and stale is not None:
+        # not modified, the stale body is fresh again
+        stale.update_validators(resp_headers)
+        return stale
+    if code == 200:
+        entry = CacheEntry(data, resp_headers.get("ETag"),
+                           resp_headers.get("Last-Modified"))
+        if self._cache_decoded is not None:
+            # parsed before it is stored, so that the cache counts its size
+            _decode_entry(entry)
+        return entry
+    return None
+
+
+def _refresh_done(self, key: Hashable, task: asyncio.Future) -> None:
+    self._in_flight.pop(key, None)
+    # nobody may wait for a background refresh, a failed one
+    # is retried by the next request
+    if not task.cancelled():
+        task.exception()
+
+
+def _request_cache_key(self, url: str, headers: JSONTYPE) -> Hashable:
+    if self._cache_per_key:
+        return url, headers.get("authorization")
+    return url
+
+
+def _check_decoded_mode(mode: Optional[str],
+                        lazy_json: bool) -> Optional[str]:
+    if mode not in DECODED_MODES:
+        raise ValueError(f"cache_decoded must be one of {DECODED_MODES}")
+    if mode is not None and lazy_json:
+        raise ValueError("cache_decoded can't be used with lazy_json")
+    return mode
+
+
 class AsyncSession(AsyncInitObject, AsyncWith):
     async def __init__(self, trust_env: bool = True,
                        cache_ttl: NUMBER = 60,
                        cache_limit: int = 1024,
                        use_cache: bool = True,
                        timeout: NUMBER = 30,
-                       repeat_failed: int = 3) -> None:
+                       repeat_failed: int = 3,
+                       rate_limit: Optional[NUMBER] = None,
+                       rate_burst: int = 1,
+                       max_concurrency: Optional[int] = None,
+                       retry_policy: Optional[RetryPolicy] = None,
+                       connector: Optional[TCPConnector] = None,
+                       connections_limit: int = 100,
+                       connections_limit_per_host: int = 0,
+                       dns_cache_ttl: Optional[int] = 10,
+                       keepalive_timeout: NUMBER = 15,
+                       cache_per_key: bool = False,
+                       cache: Optional[BaseCache] = None,
+                       cache_decoded: Optional[str] = None,
+                       cache_max_bytes: Optional[int] = None,
+                       cache_control: bool = True,
+                       cache_revalidate: NUMBER = 60 * 10,
+                       stale_while_revalidate: NUMBER = 0,
+                       lazy_json: bool = False) -> None:
+        """`dns_cache_ttl` of 0 disables the dns cache, None caches forever.
+        A shared `connector` is not closed together with the session.
+        If `cache_per_key` is true, responses are cached separately
+        for every authorization header, otherwise api keys share them.
+        `cache_max_bytes` limits the total size of the cached bodies,
+        and of their parsed json with `cache_decoded`, instead of their number.
+        If `cache_control` is true, the `Cache-Control` header sets the ttl
+        of responses that were requested without one.
+        The default cache keeps expired entries for `cache_revalidate`
+        seconds, a request for one of them sends its `ETag`
+        and `Last-Modified`, so that a 304 reply reuses the body.
+        With a `cache` backend the other cache options are ignored.
+        `cache_decoded` of "frozen" keeps parsed json in the cache,
+        hits return it read-only.
+        Entries that expired at most `stale_while_revalidate` seconds ago
+        are returned at once and refreshed in the background,
+        the default cache keeps them at least that long.
+        With `lazy_json` json objects are returned as `LazyJSON`,
+        which decodes their fields only when they are accessed,
+        this saves memory on large pages, but takes more time.
+        """
+        # check the arguments before anything needs to be closed
+        if stale_while_revalidate < 0:
+            raise ValueError("stale_while_revalidate must not be negative")
+        if cache_revalidate < 0:
+            raise ValueError("cache_revalidate must not be negative")
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self._max_concurrency = max_concurrency
+        self._cache_decoded = _check_decoded_mode(cache_decoded, lazy_json)
+        self._lazy_json = lazy_json
+
         headers = default_headers()
         loop = asyncio.get_event_loop()
+
+        connector_owner = connector is None
+        if connector_owner:
+            connector = TCPConnector(
+                limit=connections_limit,
+                limit_per_host=connections_limit_per_host,
+                use_dns_cache=dns_cache_ttl != 0,
+                ttl_dns_cache=dns_cache_ttl,
+                keepalive_timeout=keepalive_timeout,
+                loop=loop)
+
         self.session = ClientSession(
             loop=loop,
-            connector=TCPConnector(use_dns_cache=False, loop=loop),
+            connector=connector,
+            connector_owner=connector_owner,
             trust_env=trust_env,
             headers=headers,
             timeout=ClientTimeout(total=timeout),
         )
 
-        if use_cache:
-            self._cache = TTLCache(maxsize=cache_limit, ttl=cache_ttl)
-            self._current_get = self._basic_cached_get
-        else:
-            # self._cache = None
-            self._current_get = self._basic_get
+        if use_cache and cache is None:
+            cache = MemoryCache(
+                maxsize=cache_limit, ttl=cache_ttl, max_bytes=cache_max_bytes,
+                keep_stale=max(cache_revalidate, stale_while_revalidate))
+        self._cache = cache
         self._cached = use_cache
+        self._cache_control = cache_control
+        self._cache_per_key = cache_per_key
+        self._stale_while_revalidate = stale_while_revalidate
+
+        if retry_policy is None:
+            retry_policy = RetryPolicy(repeat_failed)
+        self.retry_policy = retry_policy
 
-        if repeat_failed < 0:
-            repeat_failed = 0
-        self._attempts = range(repeat_failed, -1, -1)
+        self._rate_limit = (rate_limit, rate_burst)
+        self._rate_limits = {}
+        self._limiters = {}
 
-        # self._retry = []
         self._headers_dumps = {}
-        self._init_pars = DefaultOrderedDict(list)
+        self._in_flight = {}
 
         self._debug = False
-        self.mode = Mode(MODES)
-        self.collects = ((self.mode, []))
 
     async def close(self) -> None:
         """Close underlying connector.
         Release all acquired resources.
         """
         if not self.closed:
+            for task in list(self._in_flight.values()):
+                task.cancel()
+
             # SEE: https://github.com/aio-libs/aiohttp/issues/1925
             # https://docs.aiohttp.org/en/stable/client_advanced.html#graceful-shutdown
             await self.session.close()
@@ -173,145 +336,324 @@ class AsyncSession(AsyncInitObject, AsyncWith):
         """
         return self.session.closed
 
+    @property
+    def mode(self) -> str:
+        """Mode of the current task.
+        A readonly property.
+        """
+        if self in _collected.get():
+            return COLLECT
+        return DEFAULT
+
     def collect(self):
-        self.mode = COLLECT
+        # collect() and release() work per task, so concurrent batches
+        # on one session do not see each other's parameters
+        _collected.set({**_collected.get(), self: []})
 
-    async def release(self):
-        self.mode = RELEASE
-        try:
-            result = await self._mode_dependent_get()
-        finally:
-            self.mode = DEFAULT
+    async def release(self, return_exceptions: bool = False):
+        collected = dict(_collected.get())
+        params = collected.pop(self, [])
+        _collected.set(collected)
 
-        return result
+        return await self._params_get(params, return_exceptions)
 
     raise_for_status = _raise_for_status
 
     headers_handler = _headers_handler
 
+    loads_entry = _loads_entry
+
+    response_ttl = _response_ttl
+
+    response_entry = _response_entry
+
     @property
     def cached(self) -> bool:
         return self._cached
 
+    def set_rate_limit(self, base: str, rate: Optional[NUMBER],
+                       burst: int = 1) -> None:
+        """Set the rate limit for urls starting with `base`,
+        overriding the session-wide `rate_limit`.
+        """
+        self._rate_limits[base] = (rate, burst)
+        for key in [k for k in self._limiters if k[0] == base]:
+            del self._limiters[key]
+
+    def _get_limiter(self, url: str,
+                     headers: JSONTYPE) -> Optional[TokenBucket]:
+        prefix = None
+        rate, burst = self._rate_limit
+        for base, limit in self._rate_limits.items():
+            if url.startswith(base):
+                prefix = base
+                rate, burst = limit
+                break
+
+        if rate is None:
+            return None
+
+        if prefix is None:
+            prefix = urlsplit(url).netloc
+
+        # every api key has its own quota
+        key = (prefix, headers.get("authorization"))
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = self._limiters[key] = TokenBucket(rate, burst)
+
+        return limiter
+
     async def _basic_get(self, url: str,
-                         headers: JSONTYPE) -> Tuple[int, str]:
+                         headers: JSONTYPE) -> Tuple[int, bytes, STRDICT]:
+
+        limiter = self._get_limiter(url, headers)
+        if limiter is not None:
+            await limiter.acquire()
 
         async with self.session.get(url, headers=headers) as response:
             code = response.status
-            data = await response.text()
+            # the raw body, loads_json parses it without a str copy
+            data = await response.read()
 
-        return code, data
+        return code, data, response.headers
 
-    async def _basic_cached_get(self, url: str,
-                                headers: JSONTYPE) -> Tuple[int, str]:
+    _cache_key = _request_cache_key
 
-        get_key = self._cache.get(url, NaN)
-        if get_key != NaN:
-            return get_key
+    async def _fetch_to_cache(
+            self, url: str, headers: JSONTYPE, ttl: Optional[NUMBER],
+            stale: Optional[CacheEntry]
+    ) -> Tuple[int, Union[bytes, CacheEntry], STRDICT]:
 
-        value = await self._basic_get(url, headers)
-        code, *_ = value
+        key = self._cache_key(url, headers)
+        if stale is not None:
+            headers = {**headers, **stale.conditional_headers()}
 
-        if code == 200:
-            try:
-                self._cache[url] = value
-            except ValueError:
-                pass  # value too large
+        code, data, resp_headers = await self._basic_get(url, headers)
 
-        return value
+        # only successful responses are cached, so the body is enough
+        entry = self.response_entry(code, data, resp_headers, stale)
+        if entry is None:
+            return code, data, resp_headers
 
-    async def _verified_json_get(self, url: str, from_json: bool,
-                                 headers: STRBYTE) -> None:
+        await self._cache_call(
+            self._cache.set, key, entry, self.response_ttl(ttl, resp_headers))
+        return 200, entry, resp_headers
 
-        args = (url, from_json, headers)
+    async def _cache_call(self, method: Callable, *args) -> Any:
+        if not self._cache.blocking:
+            return method(*args)
+        # disk or network access must not stop the event loop
+        return await asyncio.get_event_loop().run_in_executor(
+            None, method, *args)
 
-        headers = self._headers_dumps[headers]
-        code, data = await self._current_get(url, headers)
+    async def _basic_cached_get(
+            self, url: str, headers: JSONTYPE,
+            ttl: Optional[NUMBER] = None
+    ) -> Tuple[int, Union[bytes, CacheEntry], STRDICT]:
 
-        data = loads_json(data, from_json)
+        get_key, stale_for = await self._cache_call(
+            self._cache.get_stale, self._cache_key(url, headers), None)
+        if get_key is not None and stale_for <= 0:
+            return 200, get_key, {}
 
-        if code != 200:
-            if self._i == 0:
-                self.raise_for_status(url, code, data)
-            self._retry.append(args)
-        else:
-            arr = self._init_pars[args]
-            if None in arr:
-                arr[arr.index(None)] = data
-            else:
-                raise not_scheduled
+        task = self._refresh(url, headers, ttl, get_key)
 
-    async def _params_get(self, params: Tuple[ARGS]) -> JSONSEQ:
-        tasks = [ensure(self._verified_json_get(*a)) for a in params]
-        await gather(*tasks)
+        if get_key is not None and \
+                stale_for <= self._stale_while_revalidate:
+            # serve the stale body, the task refreshes it in the background
+            return 200, get_key, {}
 
-    async def _extend_retry(self, params: Iterable[ARGS]) -> None:
-        self._retry.extend(params)
+        # shield so that one cancelled caller does not cancel the others
+        return await asyncio.shield(task)
 
-    async def _retrying_get(
-            self, in_params: Iterable[ARGS] = None) -> List[JSONTYPE]:
+    def _refresh(self, url: str, headers: JSONTYPE, ttl: Optional[NUMBER],
+                 stale: Optional[CacheEntry]) -> asyncio.Future:
 
-        if in_params is None:
-            in_params = tuple(self._retry)
-        else:
-            in_params = tuple(in_params)
-            await self._extend_retry(in_params)
+        # concurrent misses for the same request share one in-flight task
+        key = (url, *headers.items())
+        task = self._in_flight.get(key)
+        if task is None:
+            task = ensure(self._fetch_to_cache(url, headers, ttl, stale))
+            self._in_flight[key] = task
+            task.add_done_callback(partial(_refresh_done, self, key))
 
-        for a in self._retry:
-            self._init_pars[a].append(None)
+        return task
 
-        for self._i in self._attempts:
-            params = self._retry.copy()
-            self._retry.clear()
-            await self._params_get(params)
+    async def _json_get(
+            self, url: str, from_json: bool, headers: STRBYTE,
+            ttl: Optional[NUMBER]) -> Tuple[int, STRJSON, STRDICT]:
 
-            if len(self._retry) == 0:
-                res = [self._init_pars[key].pop(0) for key in in_params]
+        headers = self._headers_dumps[headers]
+        if self._cached:
+            code, data, resp_headers = await self._basic_cached_get(
+                url, headers, ttl)
+        else:
+            code, data, resp_headers = await self._basic_get(url, headers)
 
-                for value in self._init_pars.values():
-                    if len(value) != 0:
-                        raise RuntimeError(
-                            "not all parameters were used for the answer")
-                self._init_pars.clear()
+        return code, self.loads_entry(data, from_json), resp_headers
 
-                return res
+    async def _single_get(self, url: str, from_json: bool,
+                          headers: STRBYTE,
+                          ttl: Optional[NUMBER] = None) -> STRJSON:
 
-        self._init_pars.clear()
-        self._retry.clear()
+        policy = self.retry_policy
+        attempt = 0
+        while True:
+            code, data, resp_headers = await self._json_get(
+                url, from_json, headers, ttl)
+            if code == 200:
+                return data
 
-        raise retry_end
+            if not policy.should_retry(code, attempt):
+                self.raise_for_status(url, code, data)
 
-    async def _mode_dependent_get(
-            self, params: Optional[Iterable[ARGS]] = None
-    ) -> Optional[List[JSONTYPE]]:
+            await asyncio.sleep(
+                policy.delay(attempt, resp_headers.get("Retry-After")))
+            attempt += 1
+
+    async def _verified_json_get(self, results: List[STRJSON], i: int,
+                                 args: ARGS,
+                                 return_exceptions: bool) -> None:
 
-        if self.mode == RELEASE:
-            return await self._retrying_get()
+        # every request is retried on its own schedule
+        try:
+            results[i] = await self._single_get(*args)
+        except Exception as exc:
+            if not return_exceptions:
+                raise
+            results[i] = exc
+
+    async def _params_worker(self, results: List[STRJSON],
+                             params: Iterator[Tuple[int, ARGS]],
+                             return_exceptions: bool) -> None:
+        for i, a in params:
+            await self._verified_json_get(results, i, a, return_exceptions)
+
+    async def _params_get(self, params: List[ARGS],
+                          return_exceptions: bool) -> List[STRJSON]:
+        # results are written by position, so repeated urls cost nothing
+        results = [None] * len(params)
+
+        limit = self._max_concurrency
+        if limit is None or limit >= len(params):
+            tasks = [ensure(self._verified_json_get(
+                results, i, a, return_exceptions))
+                for i, a in enumerate(params)]
+        else:
+            # a fixed number of workers share one iterator,
+            # so the batch size does not affect the number of tasks
+            params = enumerate(params)
+            tasks = [ensure(self._params_worker(
+                results, params, return_exceptions))
+                for _ in range(limit)]
 
-        if params is None:
-            raise ValueError(
-                f"params must not be None if mode is not {RELEASE!r}")
+        try:
+            await gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
 
-        if self.mode == DEFAULT:
-            self._init_pars.clear()
-            self._retry.clear()
+        return results
 
-            return await self._retrying_get(params)
+    async def _mode_dependent_get(
+            self, params: Iterable[ARGS],
+            return_exceptions: bool = False
+    ) -> Optional[List[STRJSON]]:
 
-        if self.mode == COLLECT:
-            await self._extend_retry(params)
+        collected = _collected.get().get(self)
+        if collected is not None:
+            collected.extend(params)
             return None
 
-    # async def get_params(self, params: Iterable[ARGS]) -> JSONSEQ:
-    #     return await self._retrying_get(params)
+        return await self._params_get(list(params), return_exceptions)
 
     async def gets(self, urls: STRS, from_json: BOOLS = True,
-                   headers: JSONS = {}) -> JSONSEQ:
+                   headers: JSONS = {},
+                   return_exceptions: bool = False,
+                   ttl: NUMBERS = None) -> JSONSEQ:
+        """If `return_exceptions` is true, the requests that failed
+        are returned as their exceptions instead of failing the batch.
+        `ttl` overrides how long the responses stay in the cache.
+        """
 
         params = rearrange_args(
-            urls, from_json, self.headers_handler(headers))
+            urls, from_json, self.headers_handler(headers), ttl)
+
+        return await self._mode_dependent_get(params, return_exceptions)
+
+    async def prefetch(self, urls: STRS, headers: JSONS = {},
+                       ttl: NUMBERS = None) -> None:
+        """Fetch `urls` into the cache, even if they are cached already,
+        so that later requests do not wait for them.
+        Failed requests are ignored, the cache keeps the old responses.
+        """
+        if not self._cached:
+            return
+
+        tasks = []
+        for url, hdrs, t in rearrange_args(
+                urls, self.headers_handler(headers), ttl):
+            hdrs = self._headers_dumps[hdrs]
+            stale, _ = await self._cache_call(
+                self._cache.get_stale, self._cache_key(url, hdrs), None)
+            # shield, other requests may wait for the same tasks
+            tasks.append(asyncio.shield(self._refresh(url, hdrs, t, stale)))
+
+        await gather(*tasks, return_exceptions=True)
+
+    async def _stream_worker(self, params: Iterator[Tuple[int, ARGS]],
+                             queue: asyncio.Queue) -> None:
+        for i, a in params:
+            try:
+                data = await self._single_get(*a)
+            except Exception as exc:
+                await queue.put((i, exc, False))
+            else:
+                await queue.put((i, data, True))
+
+        await queue.put(None)  # the worker is done
+
+    async def iter_gets(
+            self, urls: STRS, from_json: BOOLS = True,
+            headers: JSONS = {}, return_exceptions: bool = False,
+            ttl: NUMBERS = None) -> AsyncIterator[Tuple[int, STRJSON]]:
+        """Yield `(index, result)` pairs in the order the requests finish.
+        Failed requests are retried inside the stream,
+        the first request that runs out of attempts raises its exception,
+        unless `return_exceptions` is true, then the exception is yielded.
+        """
+
+        params = enumerate(rearrange_args(
+            urls, from_json, self.headers_handler(headers), ttl))
 
-        return await self._mode_dependent_get(params)
+        limit = self._max_concurrency
+        if limit is None:
+            params = list(params)
+            limit = len(params)
+        params = iter(params)
+
+        # a bounded queue stops the workers while the consumer is busy
+        queue = asyncio.Queue(maxsize=limit)
+        workers = [ensure(self._stream_worker(params, queue))
+                   for _ in range(limit)]
+
+        try:
+            running = len(workers)
+            while running:
+                item = await queue.get()
+                if item is None:
+                    running -= 1
+                    continue
+
+                i, data, ok = item
+                if not (ok or return_exceptions):
+                    raise data
+                yield i, data
+        finally:
+            for worker in workers:
+                worker.cancel()
 
 
 class SyncSession(SyncWith):
@@ -319,33 +661,76 @@ class SyncSession(SyncWith):
                  cache_ttl: NUMBER = 60,
                  cache_limit: int = 1024, use_cache: bool = True,
                  timeout: NUMBER = 30,
-                 repeat_failed: int = 3) -> None:
+                 repeat_failed: int = 3,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 cache: Optional[BaseCache] = None,
+                 cache_decoded: Optional[str] = None,
+                 cache_max_bytes: Optional[int] = None,
+                 cache_control: bool = True,
+                 cache_revalidate: NUMBER = 60 * 10,
+                 lazy_json: bool = False,
+                 max_workers: int = 10,
+                 executor: Optional[ThreadPoolExecutor] = None,
+                 connections_limit: Optional[int] = None,
+                 cache_per_key: bool = False) -> None:
+        """`gets` runs batches on `max_workers` threads,
+        or on a shared `executor`, which is not shut down by `close`.
+        `max_workers` of 1 runs them one after another.
+        The connection pool keeps `connections_limit` connections per host,
+        `max_workers` by default.
+        The other options work as in `AsyncSession`.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if cache_revalidate < 0:
+            raise ValueError("cache_revalidate must not be negative")
+        self._cache_decoded = _check_decoded_mode(cache_decoded, lazy_json)
+        self._lazy_json = lazy_json
         self._closed = False
 
+        self._executor_owner = executor is None and max_workers > 1
+        if self._executor_owner:
+            executor = ThreadPoolExecutor(
+                max_workers, thread_name_prefix="brawlpython")
+        self._executor = executor
+
+        if connections_limit is None:
+            connections_limit = max_workers
+
         headers = default_headers()
         self.session = Session()
         self.session.trust_env = trust_env
         self.session.headers.update(headers)
 
-        if use_cache:
-            self._cache = TTLCache(maxsize=cache_limit, ttl=cache_ttl)
-        else:
-            self._cache = None
+        # one pooled connection per thread, instead of the 10 of requests
+        adapter = HTTPAdapter(pool_maxsize=connections_limit)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        if use_cache and cache is None:
+            cache = MemoryCache(maxsize=cache_limit, ttl=cache_ttl,
+                                max_bytes=cache_max_bytes,
+                                keep_stale=cache_revalidate)
+        self._cache = cache
         self._cached = use_cache
+        self._cache_control = cache_control
+        self._cache_per_key = cache_per_key
 
         self.timeout = timeout
 
-        if repeat_failed > 1:
-            self._attempts = range(repeat_failed - 1, -1, -1)
-        else:
-            self._attempts = (0)
+        if retry_policy is None:
+            retry_policy = RetryPolicy(repeat_failed)
+        self.retry_policy = retry_policy
 
-        self._last_reqs = []
-        self._last_urls = []
+        # threads that miss the cache for the same request share one fetch
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
 
     def close(self) -> None:
         """Closes all adapters and as such the session"""
         if not self.closed:
+            if self._executor_owner:
+                self._executor.shutdown()
             self.session.close()
             self._closed = True
 
@@ -358,31 +743,138 @@ class SyncSession(SyncWith):
 
     raise_for_status = _raise_for_status
 
+    loads_entry = _loads_entry
+
+    response_ttl = _response_ttl
+
+    response_entry = _response_entry
+
+    _cache_key = _request_cache_key
+
     @property
     def cached(self) -> bool:
         return self._cached
 
-    def _simple_get(
-            self, url: str, from_json: bool = True,
-            headers: Iterable[Iterable[str]] = {}) -> Tuple[int, STRJSON]:
+    def _basic_get(self, url: str,
+                   headers: JSONTYPE) -> Tuple[int, bytes, STRDICT]:
+
         with self.session.get(
-                url, timeout=self.timeout, headers=dict(headers)) as response:
+                url, timeout=self.timeout, headers=headers) as response:
             code = response.status_code
-            data = response.text
-            if from_json:
-                data = json.loads(data)
+            data = response.content
+
+        return code, data, response.headers
+
+    def _fetch_to_cache(
+            self, url: str, headers: JSONTYPE, ttl: Optional[NUMBER],
+            stale: Optional[CacheEntry]
+    ) -> Tuple[int, Union[bytes, CacheEntry], STRDICT]:
 
-        return code, data
+        key = self._cache_key(url, headers)
+        if stale is not None:
+            headers = {**headers, **stale.conditional_headers()}
 
-    #_get = retry_to_get_data(mix_all_gets(False)(_simple_get))
-    #_gets = retry_to_get_data(mix_all_gets(True)(_simple_get))
+        code, data, resp_headers = self._basic_get(url, headers)
+        entry = self.response_entry(code, data, resp_headers, stale)
+        if entry is None:
+            return code, data, resp_headers
+
+        self._cache.set(key, entry, self.response_ttl(ttl, resp_headers))
+        return 200, entry, resp_headers
+
+    def _basic_cached_get(
+            self, url: str, headers: JSONTYPE,
+            ttl: Optional[NUMBER] = None
+    ) -> Tuple[int, Union[bytes, CacheEntry], STRDICT]:
+
+        get_key, stale_for = self._cache.get_stale(
+            self._cache_key(url, headers), None)
+        if get_key is not None and stale_for <= 0:
+            return 200, get_key, {}
+
+        key = (url, *headers.items())
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = self._fetch_to_cache(url, headers, ttl, get_key)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+
+        return result
+
+    def _single_get(self, url: str, from_json: bool,
+                    headers: JSONTYPE,
+                    ttl: Optional[NUMBER] = None) -> STRJSON:
+
+        policy = self.retry_policy
+        attempt = 0
+        while True:
+            if self._cached:
+                code, data, resp_headers = self._basic_cached_get(
+                    url, headers, ttl)
+            else:
+                code, data, resp_headers = self._basic_get(url, headers)
+            data = self.loads_entry(data, from_json)
+            if code == 200:
+                return data
+
+            if not policy.should_retry(code, attempt):
+                self.raise_for_status(url, code, data)
+
+            time.sleep(
+                policy.delay(attempt, resp_headers.get("Retry-After")))
+            attempt += 1
 
     def get(self, url: str, from_json: bool = True,
-            headers: JSONTYPE = {}) -> JSONTYPE:
-        return self._get(url, from_json=from_json,
-                         headers=headers_handler(self, headers))[0]
+            headers: JSONTYPE = {}) -> STRJSON:
+        return self._single_get(url, from_json, headers)
+
+    def _verified_get(self, args: ARGS,
+                      return_exceptions: bool) -> STRJSON:
+        try:
+            return self._single_get(*args)
+        except Exception as exc:
+            if not return_exceptions:
+                raise
+            return exc
 
     def gets(self, urls: STRS, from_json: BOOLS = True,
-             headers: JSONS = {}) -> JSONSEQ:
-        return self._gets(urls, from_json=from_json,
-                          headers=headers_handler(self, headers))
+             headers: JSONS = {}, return_exceptions: bool = False,
+             ttl: NUMBERS = None) -> JSONSEQ:
+        """If `return_exceptions` is true, the requests that failed
+        are returned as their exceptions instead of failing the batch.
+        `ttl` overrides how long the responses stay in the cache.
+        """
+        params = list(rearrange_args(urls, from_json, headers, ttl))
+
+        if self._executor is None or len(params) < 2:
+            return [self._verified_get(a, return_exceptions)
+                    for a in params]
+
+        futures = [
+            self._executor.submit(self._verified_get, a, return_exceptions)
+            for a in params]
+
+        # without return_exceptions the first failure ends the batch
+        done, _ = wait(futures, return_when=(
+            ALL_COMPLETED if return_exceptions else FIRST_EXCEPTION))
+        for future in done:
+            if future.exception() is not None:
+                for other in futures:
+                    other.cancel()
+                raise future.exception()
+
+        return [future.result() for future in futures]
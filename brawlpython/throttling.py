@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+from email.utils import parsedate_to_datetime
+import random
+from time import monotonic, time
+from typing import Collection, Optional
+
+from .typedefs import NUMBER
+
+__all__ = (
+    "TokenBucket",
+    "RetryPolicy",
+    "parse_retry_after")
+
+
+class TokenBucket(object):
+    """Token bucket that paces requests to `rate` per second,
+    allowing bursts of up to `burst` requests.
+    """
+
+    __slots__ = "rate", "burst", "_tokens", "_last", "_lock"
+
+    def __init__(self, rate: NUMBER, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._last = monotonic()
+        self._lock = None
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def delay(self) -> float:
+        """Time in seconds until the next token is available."""
+        self._refill()
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    async def acquire(self) -> None:
+        # the lock makes waiters take tokens in the order they came
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            wait = self.delay()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                self._refill()
+            self._tokens -= 1
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a `Retry-After` header,
+    which is either a number of seconds or an http-date.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max(0.0, date.timestamp() - time())
+
+
+class RetryPolicy(object):
+    """Decides which failed requests are repeated and how long to wait.
+
+    The delay before the n-th retry grows as `backoff * factor ** n`,
+    up to `max_delay`, with full jitter if `jitter` is true.
+    A `Retry-After` header, if present, is the lower bound of the delay.
+    """
+
+    __slots__ = ("retries", "backoff", "factor", "max_delay",
+                 "jitter", "retry_codes", "max_retry_after")
+
+    def __init__(self, retries: int = 3,
+                 backoff: NUMBER = 0.5,
+                 factor: NUMBER = 2,
+                 max_delay: NUMBER = 30,
+                 jitter: bool = True,
+                 retry_codes: Collection[int] = (429, 500, 502, 503, 504),
+                 max_retry_after: NUMBER = 60) -> None:
+
+        if retries < 0:
+            retries = 0
+
+        self.retries = retries
+        self.backoff = backoff
+        self.factor = factor
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retry_codes = frozenset(retry_codes)
+        self.max_retry_after = max_retry_after
+
+    def should_retry(self, code: int, attempt: int) -> bool:
+        return attempt < self.retries and code in self.retry_codes
+
+    def delay(self, attempt: int,
+              retry_after: Optional[str] = None) -> float:
+
+        delay = min(self.max_delay, self.backoff * self.factor ** attempt)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+
+        after = parse_retry_after(retry_after)
+        if after is not None:
+            delay = max(delay, min(after, self.max_retry_after))
+
+        return delay
@@ -29,6 +29,7 @@ __all__ = (
     "JSONS",
     "HANDLER",
     "NUMBER",
+    "NUMBERS",
     "INTSTR",
     "AKW",
     "STRBYTE")
@@ -54,6 +55,8 @@ HANDLER = Callable[["AsyncClient", JSONSEQ], JSONSEQ]
 
 NUMBER = Union[int, float]
 
+NUMBERS = Union[Sequence[Optional[NUMBER]], Optional[NUMBER]]
+
 INTSTR = Union[int, str]
 
 ARGS = Sequence[Any]
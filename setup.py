@@ -29,7 +29,6 @@ setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Topic :: Games/Entertainment :: Real Time Strategy",
@@ -55,5 +54,5 @@ setup(
         "Code examples": github_link + "/tree/master/examples",
     },
     install_requires=requirements,
-    python_requires="~=3.6",
+    python_requires="~=3.7",
 )
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from brawlpython.api import (
+    API, default_api_dict, OFFIC, STAR, compile_template, default_format)
+from brawlpython.exceptions import InvalidTag
+
+
+def test_make_url():
+    api = API("api.test.com/v1", {"players": "players/{tag}"})
+
+    assert api.get("base") == "https://api.test.com/v1/"
+    assert (api.make_url("players", tag="#2ppo")
+            == "https://api.test.com/v1/players/%232PP0")
+
+    with pytest.raises(ValueError):
+        api.get("clubs")
+
+
+def test_compile_template():
+    for template in "a/{x}/{y}", "a/{x:>3}/{y!r}", "{{x}}{x}":
+        for params in {}, {"x": 1, "y": None}, {"x": "b", "y": 0}:
+            assert (compile_template(template)(params)
+                    == default_format(template, **params))
+
+
+def test_make_urls():
+    api = API("api.test.com", {"members": "clubs/{tag}/members"})
+
+    assert (api.make_urls("members", ["#2P", "Y"], limit=5)
+            == [api.make_url("members", tag=tag, limit=5)
+                for tag in ("#2P", "Y")])
+    assert api.make_url("members", tag="Y").endswith("%23Y/members")
+
+
+def test_tag_validation():
+    api = API("api.test.com", {"players": "players/{tag}"})
+
+    for tag in "", "#", "#2PX", "#2P P":
+        with pytest.raises(InvalidTag):
+            api.make_url("players", tag=tag)
+
+    api = API("api.test.com", {"players": "players/{tag}"},
+              hashtag=False, validate_tags=False)
+    assert api.make_url("players", tag="#abo").endswith("players/abo")
+
+
+def test_ttls():
+    api = API("api.test.com", {"a": "a", "b": "b"}, ttls={"a": 10})
+
+    assert api.get_ttl("a") == 10
+    assert api.get_ttl("b") is None
+
+    assert default_api_dict[OFFIC].get_ttl("players") is None
+    assert default_api_dict[STAR].get_ttl("icons") > 60
+
+
+if __name__ == "__main__":
+    import run_tests
+
+    run_tests.run(__file__)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import pytest
+from brawlpython.api_toolkit import (
+    multiparams, rearrange_args, rearrange_columns, rearrange_params)
+
+
+def test_rearrange_params():
+    assert list(rearrange_params()) == [((), {})]
+    assert list(rearrange_params("a", b=[1])) == [(("a",), {"b": 1})]
+
+    rows = list(rearrange_params(["a", "b"], "c", d=(1, 2), e=[], f={}))
+    assert rows == [(("a", "c"), {"d": 1, "e": [], "f": {}}),
+                    (("b", "c"), {"d": 2, "e": [], "f": {}})]
+    assert rows[0][1] is not rows[1][1]
+
+    assert list(rearrange_args({1, 2}, "x")) == [(1, "x"), (2, "x")]
+
+    with pytest.raises(ValueError):
+        rearrange_params([1, 2], b=[1, 2, 3])
+
+
+def test_rearrange_columns():
+    length, args, kwargs = rearrange_columns(
+        "official", ["players", "clubs"], tag="#2PP", limit=[1, 2])
+
+    assert length == 2
+    assert args == [["official"] * 2, ["players", "clubs"]]
+    assert kwargs == {"tag": ["#2PP"] * 2, "limit": [1, 2]}
+
+
+async def test_multiparams():
+    running = peak = 0
+
+    @multiparams(chunk_size=10, concurrency=3)
+    async def add(x, y):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001 * (x % 3))
+        running -= 1
+        return x + y
+
+    assert await add(list(range(50)), 1) == list(range(1, 51))
+    assert peak == 3
+
+    @multiparams(stream=True, chunk_size=2)
+    async def double(x):
+        return x * 2
+
+    assert [x async for x in double([1, 2, 3])] == [2, 4, 6]
+
+    @multiparams(stream=True)
+    def negate(x):
+        return -x
+
+    assert list(negate([1, 2])) == [-1, -2]
+    assert multiparams(lambda x: x)([1, 2]) == [1, 2]
+
+    with pytest.raises(ValueError):
+        multiparams(chunk_size=0)(double)
+    # the options that would be ignored are rejected
+    with pytest.raises(ValueError):
+        multiparams(chunk_size=2)(negate)
+    with pytest.raises(ValueError):
+        multiparams(concurrency=2)(negate)
+    with pytest.raises(ValueError):
+        multiparams(stream=True)(add.__wrapped__)
+
+
+if __name__ == "__main__":
+    import run_tests
+
+    run_tests.run(__file__)
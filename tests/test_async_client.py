@@ -1,9 +1,14 @@
 # -*- coding: utf-8 -*-
 
 import asyncio
+from aiohttp import web
 from brawlpython import AsyncClient
+from brawlpython.api import default_api_dict, OFFIC
 from brawlpython.api_toolkit import unique, same
 from brawlpython.cache_utils import iscoro
+from brawlpython.clients import _set_saves, _find_save
+from brawlpython.exceptions import InvalidTag
+from brawlpython.sessions import AsyncSession
 from configobj import ConfigObj
 import pytest
 
@@ -34,6 +39,38 @@ def client(factory, loop):
     return loop.run_until_complete(factory(api_key))
 
 
+@pytest.fixture
+def local_api(aiohttp_server, monkeypatch):
+    """Local server that answers the requests for the official api
+    with `{"items": [{"id": n, "name": "SHELLY"}]}`,
+    `n` counts the requests, `paths` lists their paths.
+    """
+    class Local:
+        paths = []
+
+    async def handler(request):
+        Local.paths.append(request.path)
+        return web.json_response(
+            {"items": [{"id": len(Local.paths), "name": "SHELLY"}]})
+
+    async def maker():
+        app = web.Application()
+        app.router.add_get("/{path:.*}", handler)
+        server = await aiohttp_server(app)
+
+        base = default_api_dict[OFFIC].base
+        local = str(server.make_url("/"))
+        basic_get = AsyncSession._basic_get
+
+        async def local_get(self, url, headers):
+            return await basic_get(self, url.replace(base, local), headers)
+
+        monkeypatch.setattr(AsyncSession, "_basic_get", local_get)
+        return Local
+
+    return maker
+
+
 async def test_async_init():
     client = AsyncClient(api_key)
 
@@ -68,6 +105,64 @@ async def no_test_no_cache(factory):
     assert unique(await client._gets([url_uuid] * 2))
 
 
+def test_find_save():
+    class Saves:
+        _saves = {}
+        _save_indexes = {}
+        set_saves = _set_saves
+        find_save = _find_save
+
+    client = Saves()
+    client.set_saves({"b": [{"id": 16000000, "name": "SHELLY"},
+                            {"id": 16000001, "name": "COLT"}]})
+
+    assert client.find_save("b", "colt")["id"] == 16000001
+    assert client.find_save("b", 16000000)["name"] == "SHELLY"
+    assert client.find_save("b", -1)["name"] == "COLT"
+    assert client.find_save("b", "Shelly", "name")["id"] == 16000000
+    assert client.find_save("b", "bull") is None
+
+
+async def test_background_refresh(factory, local_api):
+    server = await local_api()
+    client = await factory(refresh_interval=0.2)
+    client.add_hot_key("players", tag="#2PP")
+    first = client.find_save("b", "shelly")["id"]
+
+    await asyncio.sleep(0.5)
+    # the brawlers are cached for hours, prefetch fetches them anyway
+    assert client.find_save("b", "shelly")["id"] > first
+    assert "/players/#2PP" in server.paths
+
+    await client.close()
+    assert client._refresher is None
+
+
+async def test_invalid_tags(factory, local_api):
+    server = await local_api()
+    client = await factory(return_exceptions=True)
+    tags = ["#2PP", "#XX", "#8QQ"]
+
+    # an invalid tag fails its own request, the others are sent
+    first, error, last = await client.players(tags)
+    assert isinstance(error, InvalidTag) and error.tag == "#XX"
+    assert first[0]["id"] < last[0]["id"]
+    assert server.paths[-2:] == ["/players/#2PP", "/players/#8QQ"]
+
+    client.collect()
+    await client.players(tags[1:])
+    await client.clubs(tags[:2])
+    results = await client.release()
+    assert [type(res) for res in results] == [
+        InvalidTag, list, list, InvalidTag]
+
+    indexes = [i async for i, _ in client.iter_players(tags)]
+    assert sorted(indexes) == [0, 1, 2]
+
+    with pytest.raises(InvalidTag):
+        client.add_hot_key("players", tag=tags)
+
+
 # FIXME: complete test
 async def test_data_handler(factory):
     client = await factory(api_key, data_handler=lambda *x: None)
@@ -2,13 +2,16 @@
 
 import pytest
 import asyncio
-from brawlpython.sessions import AsyncSession
+from aiohttp import web
+from brawlpython.sessions import AsyncSession, loads_json
 from brawlpython.api_toolkit import unique, same
 from brawlpython.cache_utils import iscoro
+from brawlpython.exceptions import NotFound
 from configobj import ConfigObj
 
 
 url_uuid = "http://httpbin.org/uuid"
+url_404 = "http://httpbin.org/status/404"
 
 
 # @pytest.yield_fixture
@@ -37,6 +40,57 @@ def client(factory, loop):
     return loop.run_until_complete(factory(api_key, cache_ttl=1))
 
 
+@pytest.fixture
+def stub(aiohttp_server):
+    """Local server that answers `/{i}` with `{"i": i, "n": n}` after
+    `delay / (i + 1)` seconds, so that later requests finish first.
+    `n` counts the requests it served, `peak` is the largest number
+    of requests it served at once. `missing` answers with 404.
+    `tagged` has an ETag and answers with 304 if it is sent back,
+    `validators` lists the If-None-Match headers that it got.
+    """
+    class Stub:
+        running = peak = served = 0
+        delay = 0.05
+        validators = []
+
+    async def handler(request):
+        i = int(request.match_info["i"])
+        Stub.running += 1
+        Stub.peak = max(Stub.peak, Stub.running)
+        try:
+            await asyncio.sleep(Stub.delay / (i + 1))
+        finally:
+            Stub.running -= 1
+        Stub.served += 1
+        return web.json_response({"i": i, "n": Stub.served})
+
+    async def not_found(request):
+        return web.json_response(
+            {"reason": "notFound", "message": "Not found"}, status=404)
+
+    async def tagged(request):
+        etag = request.headers.get("If-None-Match")
+        Stub.validators.append(etag)
+        if etag == '"v1"':
+            return web.Response(status=304, headers={"ETag": '"v1"'})
+        Stub.served += 1
+        return web.json_response({"n": Stub.served}, headers={"ETag": '"v1"'})
+
+    async def maker():
+        app = web.Application()
+        app.router.add_get("/missing", not_found)
+        app.router.add_get("/tagged", tagged)
+        app.router.add_get("/{i}", handler)
+        server = await aiohttp_server(app)
+        Stub.url = lambda i: str(server.make_url(f"/{i}"))
+        Stub.missing = str(server.make_url("/missing"))
+        Stub.tagged = str(server.make_url("/tagged"))
+        return Stub
+
+    return maker
+
+
 async def test_async_init():
     client = AsyncSession(api_key)
 
@@ -63,6 +117,137 @@ async def test_cache(client):
     assert await client.get(url_uuid) != responses[0]
 
 
+async def test_coalescing(factory, stub):
+    server = await stub()
+    client = await factory(False)
+
+    # concurrent misses for one url wait for the same request
+    responses = await asyncio.gather(
+        *[client.gets(server.url(0)) for _ in range(3)])
+    assert same(responses)
+    assert server.served == 1
+
+    assert same(await client.gets([server.url(1)] * 3))
+    assert server.served == 2
+
+
+async def test_iter_gets(factory, stub):
+    server = await stub()
+    server.delay = 0.3
+    client = await factory(False)
+
+    indexes = []
+    async for i, data in client.iter_gets([server.url(i) for i in range(3)]):
+        indexes.append(i)
+        assert data["i"] == i
+
+    # later requests are answered sooner, so they come first
+    assert indexes == [2, 1, 0]
+
+
+async def test_return_exceptions(factory, stub):
+    server = await stub()
+    client = await factory(False)
+    urls = [server.url(0), server.missing]
+
+    data, error = await client.gets(urls, return_exceptions=True)
+
+    assert data["i"] == 0
+    assert isinstance(error, NotFound)
+
+    with pytest.raises(NotFound):
+        await client.gets(urls)
+
+
+async def test_max_concurrency(factory, stub):
+    server = await stub()
+    client = await factory(False, use_cache=False, max_concurrency=3)
+
+    results = await client.gets([server.url(i) for i in range(10)])
+    assert [data["i"] for data in results] == list(range(10))
+    assert server.peak == 3
+
+
+async def test_cache_decoded(factory, stub):
+    server = await stub()
+    client = await factory(
+        False, cache_decoded="frozen", cache_max_bytes=100)
+
+    # the body fits into the budget, but not together with the parsed body
+    assert (await client.gets(server.url(1)))[0]["i"] == 1
+    assert client._cache.currsize == 0
+    await client.close()
+
+    client = await factory(False, cache_decoded="frozen")
+    data, again = await client.gets([server.url(1)] * 2)
+    assert data is again
+
+    # hits share the cached object, so it can't be changed
+    with pytest.raises(TypeError):
+        data["i"] = 2
+
+    with pytest.raises(ValueError):
+        await factory(False, cache_decoded="copy")
+
+
+async def test_concurrent_batches(factory, stub):
+    server = await stub()
+    client = await factory(False)
+
+    async def batch(start):
+        client.collect()
+        await client.gets(server.url(start))
+        await client.gets([server.url(start + 1), server.url(start + 2)])
+        return await client.release()
+
+    # every task releases only the requests that it collected
+    results = await asyncio.gather(*[batch(i) for i in (0, 3, 6)])
+    assert [[data["i"] for data in res] for res in results] == [
+        [0, 1, 2], [3, 4, 5], [6, 7, 8]]
+    assert client.mode == "default"
+
+
+async def test_stale_while_revalidate(factory, stub, loop):
+    server = await stub()
+    client = await factory(False, cache_ttl=0.2, stale_while_revalidate=5)
+    url = server.url(0)
+
+    response = await client.gets(url)
+    await asyncio.sleep(0.3)
+
+    # the stale response comes back at once, although refreshing is slow
+    server.delay = 0.5
+    start = loop.time()
+    assert await client.gets(url) == response
+    assert loop.time() - start < 0.25
+
+    refreshes = list(client._in_flight.values())
+    assert len(refreshes) == 1
+    await asyncio.gather(*refreshes)
+
+    assert (await client.gets(url))[0]["n"] == response[0]["n"] + 1
+
+
+async def test_revalidate(factory, stub):
+    server = await stub()
+    client = await factory(False, cache_ttl=0.1)
+
+    response = await client.gets(server.tagged)
+    await asyncio.sleep(0.2)
+
+    # the expired entry is kept by default, its etag is sent back
+    # and the 304 reply reuses its body
+    assert await client.gets(server.tagged) == response
+    assert server.validators == [None, '"v1"']
+    assert server.served == 1
+
+
+def test_loads_json():
+    assert loads_json(b'{"a": [1]}') == {"a": [1]}
+    assert loads_json(b'{"a": [1]}', False) == '{"a": [1]}'
+    assert loads_json("not json".encode()) == "not json"
+
+
 async def test_no_cache(factory):
     client = await factory(api_key, use_cache=False)
 
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+import pickle
+import pytest
+import time
+from brawlpython.cache_utils import (
+    BaseCache, MemoryCache, SQLiteCache, NaN, CacheEntry, freeze_json,
+    json_size, max_age)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        cache = MemoryCache(ttl=1, keep_stale=60)
+    else:
+        cache = SQLiteCache(str(tmp_path / "cache.db"), ttl=1)
+
+    yield cache
+
+    cache.close()
+
+
+def test_get_set(cache):
+    assert cache.get("url", NaN) is NaN
+
+    cache.set("url", CacheEntry(b"data"))
+    cache.set(("url", "key"), CacheEntry(b"{}", '"v1"', "date"))
+    assert cache.get("url").data == b"data"
+
+    entry = cache.get(("url", "key"))
+    assert (entry.data, entry.etag, entry.last_modified) == (
+        b"{}", '"v1"', "date")
+
+    cache.delete("url")
+    assert cache.get("url") is None
+
+    cache.clear()
+    assert cache.get(("url", "key")) is None
+
+
+def test_expiration(cache):
+    cache.set("url", CacheEntry(b"data"))
+    time.sleep(1.1)
+    assert cache.get("url") is None
+
+
+def test_ttl(cache):
+    cache.set("short", CacheEntry(b"data"), ttl=0.5)
+    cache.set("long", CacheEntry(b"data"), ttl=10)
+    cache.set("never", CacheEntry(b"data"), ttl=0)
+    assert cache.get("never") is None
+
+    time.sleep(0.6)
+    assert cache.get("short") is None
+    assert cache.get("long").data == b"data"
+
+
+def test_get_stale(cache):
+    cache.set("key", CacheEntry(b"data"), ttl=0.5)
+    value, stale_for = cache.get_stale("key")
+    assert value.data == b"data" and stale_for <= 0
+
+    time.sleep(0.6)
+    assert cache.get("key") is None
+    value, stale_for = cache.get_stale("key")
+    assert value.data == b"data" and stale_for > 0
+
+    assert cache.get_stale("missing") == (None, 0)
+
+
+def test_keep_stale():
+    cache = MemoryCache(maxsize=2, ttl=0.2, keep_stale=0.2)
+    cache.set("live", CacheEntry(b"live"), ttl=10)
+    cache.set("dead", CacheEntry(b"dead"))
+
+    time.sleep(0.3)
+    assert cache.get_stale("dead")[0].data == b"dead"
+
+    time.sleep(0.2)
+    # the dead entry goes instead of the least recently used live one
+    cache.set("new", CacheEntry(b"new"))
+    assert cache.get("live").data == b"live"
+    assert cache.get_stale("dead") == (None, 0)
+    assert cache.currsize == 2
+
+
+def test_max_bytes():
+    cache = MemoryCache(max_bytes=100)
+
+    cache.set("a", CacheEntry("a" * 60))
+    cache.set("b", CacheEntry("b" * 30))
+    assert cache.currsize == 90
+
+    cache.set("c", CacheEntry("c" * 60))
+    assert cache.get("a") is None
+    assert cache.get("b").size == 30
+    assert cache.currsize == 90
+
+    cache.set("d", CacheEntry("d" * 101))  # larger than the whole cache
+    assert cache.get("d") is None
+
+
+def test_sqlite_persistence(tmp_path):
+    path = str(tmp_path / "cache.db")
+
+    cache = SQLiteCache(path)
+    cache.set("url", CacheEntry(b"data", '"v1"'))
+    # only entries are stored, the file is never unpickled
+    cache.set("other", {"a": 1})
+    cache.close()
+
+    cache = SQLiteCache(path)
+    assert cache.get("url").conditional_headers() == {"If-None-Match": '"v1"'}
+    assert cache.get("other") is None
+    cache.close()
+
+
+def test_base_cache():
+    with pytest.raises(TypeError):
+        BaseCache()
+
+    assert not MemoryCache.blocking and SQLiteCache.blocking
+
+
+def test_max_age():
+    assert max_age(None) is None
+    assert max_age("public") is None
+    assert max_age("public, max-age=120") == 120
+    assert max_age("no-store") == 0
+    assert max_age("max-age=soon") is None
+
+
+def test_cache_entry():
+    entry = CacheEntry('{"a": 1}')
+    entry.decoded = {"a": 1}
+    assert entry.size == 8
+
+    entry = pickle.loads(pickle.dumps(entry))
+    assert entry.data == '{"a": 1}'
+    assert entry.decoded is NaN
+    assert entry.conditional_headers() == {}
+
+    entry.update_validators({"ETag": '"v1"', "Last-Modified": "date"})
+    entry = pickle.loads(pickle.dumps(entry))
+    assert entry.conditional_headers() == {
+        "If-None-Match": '"v1"', "If-Modified-Since": "date"}
+
+
+def test_freeze_json():
+    frozen = freeze_json({"items": [{"a": 1}], "paging": {}})
+
+    assert frozen["items"][0]["a"] == 1
+    assert isinstance(frozen["items"], tuple)
+
+    with pytest.raises(TypeError):
+        frozen["paging"]["a"] = 1
+
+
+def test_json_size():
+    rows = [{"tag": "#2PP", "trophies": i} for i in range(100)]
+
+    assert json_size([]) < json_size(rows[:1]) < json_size(rows)
+    assert json_size({"items": rows}) > json_size(rows)
+
+
+if __name__ == "__main__":
+    import run_tests
+
+    run_tests.run(__file__)
@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 
 import pytest
-from brawlpython.exceptions import ClientResponseError, UnexpectedResponseCode
+from brawlpython.exceptions import (
+    ClientResponseError, InvalidTag, UnexpectedResponseCode)
 
 
 def test_repr():
@@ -11,6 +12,8 @@ def test_repr():
     exc = UnexpectedResponseCode("1", 2, "3", "4")
     assert eval(repr(exc)) == exc
 
+    assert repr(eval(repr(InvalidTag("#X")))) == repr(InvalidTag("#X"))
+
 
 if __name__ == "__main__":
     import run_tests
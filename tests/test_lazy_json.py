@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+import json
+import pytest
+from brawlpython.lazy_json import LazyJSON, LazyArray
+
+
+document = {
+    "items": [{"tag": "#2PP", "name": "a \"]}[{\\", "club": {"name": "b"}},
+              {"tag": "#8QQ", "trophies": [1, {"x": None}]}],
+    "paging": {"cursors": {}},
+    "empty": [],
+    "escaped\\key": "ü",
+    "number": -1.5e3}
+
+
+@pytest.mark.parametrize("data", [
+    json.dumps(document),
+    json.dumps(document, indent=2, ensure_ascii=False).encode()])
+def test_lazy_json(data):
+    lazy = LazyJSON(data)
+
+    assert set(lazy) == set(document)
+    assert lazy["number"] == document["number"]
+    assert lazy["escaped\\key"] == "ü"
+
+    items = lazy["items"]
+    assert isinstance(items, LazyArray)
+    assert len(items) == 2
+    assert items[-1] == document["items"][-1]
+    assert items[:1] == document["items"][:1]
+    assert list(lazy.iter_items()) == document["items"]
+    assert list(lazy["empty"]) == []
+
+
+def test_deep_nesting():
+    # deeper than the single-match scan, so it counts brackets instead
+    deep = {"items": [[[[[[[[["]", {"a": "[{"}]]]]]]]], 1],
+            "nested": {"a": [[[[[[[[{}]]]]]]]]}}
+    lazy = LazyJSON(json.dumps(deep))
+
+    assert list(lazy["items"]) == deep["items"]
+    assert lazy["nested"] == deep["nested"]
+
+
+@pytest.mark.parametrize("data", [
+    "[1]", "", '{"a": 1', '{"a": 1} 2', '{"a" 1}', '{"a": "b}',
+    '{"a": [1 2]}', '{"a": [1,]}'])
+def test_invalid(data):
+    with pytest.raises(ValueError):
+        LazyJSON(data)
+
+
+if __name__ == "__main__":
+    import run_tests
+
+    run_tests.run(__file__)
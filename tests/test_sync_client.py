@@ -2,7 +2,10 @@
 
 from brawlpython import SyncClient
 from brawlpython.api_toolkit import unique, same
+from brawlpython.exceptions import InvalidTag, NotFound
+from brawlpython.sessions import SyncSession
 from configobj import ConfigObj
+import json
 import pytest
 import time
 
@@ -33,6 +36,32 @@ def client(factory):
     return factory(api_key)
 
 
+@pytest.fixture
+def offline(monkeypatch):
+    """Answers the requests of sync sessions without the network.
+    `answers` maps a part of the url to the code and the json
+    of the response, other urls get an empty list of items.
+    `urls` and `headers` list the requested urls and their headers.
+    """
+    class Offline:
+        answers = {}
+        urls = []
+        headers = []
+
+    def basic_get(self, url, headers):
+        Offline.urls.append(url)
+        Offline.headers.append(headers)
+        for part, (code, data) in Offline.answers.items():
+            if part in url:
+                break
+        else:
+            code, data = 200, {"items": []}
+        return code, json.dumps(data).encode(), {}
+
+    monkeypatch.setattr(SyncSession, "_basic_get", basic_get)
+    return Offline
+
+
 def test_sync_init():
     client = SyncClient(api_key)
 
@@ -48,6 +77,59 @@ def test_closing(client):
         assert client.closed
 
 
+def test_update_saves(factory, offline):
+    brawlers = [{"id": 16000000, "name": "SHELLY"}]
+    offline.answers["/brawlers/"] = 200, {"items": brawlers}
+
+    client = factory(api_key)
+    assert client.find_save("b", "shelly") == brawlers[0]
+
+    # a failed request fails the update, even with return_exceptions
+    offline.answers["/brawlers/"] = 404, {"reason": "notFound"}
+    with pytest.raises(NotFound):
+        factory(api_key, use_cache=False, return_exceptions=True)
+
+
+def test_requests(factory, offline):
+    offline.answers["/brawlers/"] = 200, {
+        "items": [{"id": 16000000, "name": "SHELLY"}]}
+    client = factory("KEY", max_workers=2)
+    base = "https://api.brawlstars.com/v1/"
+
+    assert client.players(["#2pp", "#8QQ"]) == [[], []]
+    client.members("#2PP", limit=5)
+    # the id of the brawler comes from the saves
+    client.rankings("b", key="shelly", code="ru")
+    assert offline.urls[-4:] == [
+        base + "players/%232PP", base + "players/%238QQ",
+        base + "clubs/%232PP/members?limit=5",
+        base + "rankings/ru/brawlers/16000000?limit=200"]
+    assert all(headers == {"authorization": "Bearer KEY"}
+               for headers in offline.headers)
+
+    # the responses are cached, the same request is not sent again
+    requested = len(offline.urls)
+    client.players("#2PP")
+    assert len(offline.urls) == requested
+
+
+def test_invalid_tags(factory, offline):
+    client = factory(api_key, return_exceptions=True)
+
+    # an invalid tag fails its own request, the others are sent
+    first, error, last = client.players(["#2PP", "#XX", "#8QQ"])
+    assert first == last == []
+    assert isinstance(error, InvalidTag) and error.tag == "#XX"
+    assert offline.urls[-2:] == [
+        "https://api.brawlstars.com/v1/players/%232PP",
+        "https://api.brawlstars.com/v1/players/%238QQ"]
+
+    client.close()
+    client = factory(api_key)
+    with pytest.raises(InvalidTag):
+        client.players(["#2PP", "#XX"])
+
+
 def no_test_cache(client):
     responses = [client._get(url_uuid) for _ in range(2)]
     assert same(responses)
@@ -2,12 +2,15 @@
 
 from brawlpython.sessions import SyncSession
 from brawlpython.api_toolkit import unique, same
+from brawlpython.exceptions import NotFound
 from configobj import ConfigObj
+import json
 import pytest
 import time
 
 
 url_uuid = "http://httpbin.org/uuid"
+url_404 = "http://httpbin.org/status/404"
 
 config = ConfigObj("config.ini")
 api_key = config["DEFAULT"].get("API_KEY")
@@ -48,6 +51,27 @@ def test_closing(client):
         assert client.closed
 
 
+def test_revalidate(factory, monkeypatch):
+    sent = []
+
+    def basic_get(self, url, headers):
+        sent.append(headers.get("If-None-Match"))
+        if sent[-1] == '"v1"':
+            return 304, b"", {"ETag": '"v1"'}
+        return 200, json.dumps({"n": len(sent)}).encode(), {"ETag": '"v1"'}
+
+    monkeypatch.setattr(SyncSession, "_basic_get", basic_get)
+    client = factory(False, cache_ttl=0.1)
+
+    response = client.get(url_uuid)
+    time.sleep(0.2)
+
+    # the expired entry is kept by default, its etag is sent back
+    # and the 304 reply reuses its body
+    assert client.get(url_uuid) == response
+    assert sent == [None, '"v1"']
+
+
 def test_cache(client):
     responses = [client.get(url_uuid) for _ in range(2)]
     assert same(responses)
@@ -57,6 +81,24 @@ def test_cache(client):
     assert client.get(url_uuid) != responses[0]
 
 
+def test_parallel_gets(factory):
+    for max_workers in 1, 4:
+        client = factory(api_key, use_cache=False, max_workers=max_workers)
+
+        assert unique(client.gets([url_uuid] * 4))
+        client.close()
+
+
+def test_return_exceptions(client):
+    data, error = client.gets([url_uuid, url_404], return_exceptions=True)
+
+    assert "uuid" in data
+    assert isinstance(error, NotFound)
+
+    with pytest.raises(NotFound):
+        client.gets([url_uuid, url_404])
+
+
 def test_no_cache(factory):
     client = factory(api_key, use_cache=False)
 
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import time
+from brawlpython.throttling import (
+    TokenBucket, RetryPolicy, parse_retry_after)
+
+
+def test_bucket_arguments():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+    with pytest.raises(ValueError):
+        TokenBucket(1, 0)
+
+
+async def test_bucket_pacing():
+    bucket = TokenBucket(50, burst=5)
+
+    start = time.monotonic()
+    for _ in range(5):
+        await bucket.acquire()
+    assert time.monotonic() - start < 0.05
+
+    for _ in range(5):
+        await bucket.acquire()
+    assert time.monotonic() - start >= 0.09
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("2") == 2
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert parse_retry_after("soon") is None
+
+
+def test_retry_policy():
+    policy = RetryPolicy(2, backoff=1, factor=2, max_delay=3, jitter=False)
+
+    assert policy.should_retry(503, 0)
+    assert policy.should_retry(429, 1)
+    assert not policy.should_retry(503, 2)
+    assert not policy.should_retry(404, 0)
+
+    assert [policy.delay(i) for i in range(3)] == [1, 2, 3]
+    assert policy.delay(0, "10") == 10
+
+    policy.jitter = True
+    assert 0 <= policy.delay(1) <= 2
+
+
+if __name__ == "__main__":
+    import run_tests
+
+    run_tests.run(__file__)